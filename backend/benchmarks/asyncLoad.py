@@ -0,0 +1,102 @@
+import argparse
+import asyncio
+import time
+
+import anyio.to_thread
+import httpx
+import benchmarks.benchUtil as bu
+from fastapi import APIRouter, Depends
+from sqlmodel import Session, text
+from database import getSession, getAsyncSession, close_async_engine
+from utils.cityUtil import normalize_city
+
+# Synchronous twin of GET /trips/get: same SQL, but on a threadpool worker with a blocking Session
+syncRouter = APIRouter()
+
+@syncRouter.get("/sync/trips/get")
+def syncTripSearch(start_city: str, end_city: str, session: Session = Depends(getSession)):
+    route = session.exec(
+        text("select * from routes where start_key = :sKey and end_key = :eKey"),
+        params={"sKey": normalize_city(start_city), "eKey": normalize_city(end_city)}
+    ).first()
+    rows = session.exec(
+        text("""
+        select t.id, b.operator, b.id as bus_id, b.air_type, b.seat_type,
+               t.departure_time, t.arrival_time, b.rating, t.price, t.seatsAvailable
+        from trips t
+        join buses b on b.id = t.bus_id
+        where t.route_id = :rId
+        order by t.id
+        """),
+        params={'rId': route.id}
+    ).all()
+    return {"message": "trip data fetched", 'data': [dict(r._mapping) for r in rows]}
+
+def simulateLatency(app, latency_ms: float):
+    # Local SQLite answers in microseconds; a networked database makes every request wait.
+    # Model that wait once per request: blocking in the sync dependency, awaited in the async one.
+    def slowSession():
+        time.sleep(latency_ms / 1000)
+        yield from getSession()
+
+    async def slowAsyncSession():
+        await asyncio.sleep(latency_ms / 1000)
+        async for session in getAsyncSession():
+            yield session
+
+    app.dependency_overrides[getSession] = slowSession
+    app.dependency_overrides[getAsyncSession] = slowAsyncSession
+
+async def drive(app, path: str, concurrency: int, requests: int):
+    latencies = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="https://testserver") as client:
+        queue = asyncio.Queue()
+        for i in range(requests):
+            queue.put_nowait(i)
+
+        async def worker():
+            while not queue.empty():
+                queue.get_nowait()
+                start = time.perf_counter()
+                response = await client.get(path, params={'start_city': "city0", 'end_city': "city1"})
+                response.raise_for_status()
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return requests / elapsed, latencies
+
+async def run(args):
+    from main import app
+    app.include_router(syncRouter)
+    # Shrink the worker pool to make the sync ceiling visible at modest concurrency
+    anyio.to_thread.current_default_thread_limiter().total_tokens = args.threadpool
+    if args.io_latency_ms:
+        simulateLatency(app, args.io_latency_ms)
+
+    print(f"{'mode':>5} {'conc':>5} {'req/s':>8} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7}")
+    for concurrency in [int(c) for c in args.concurrency.split(",")]:
+        for mode, path in (("sync", "/sync/trips/get"), ("async", "/trips/get")):
+            rps, latencies = await drive(app, path, concurrency, args.requests)
+            print(f"{mode:>5} {concurrency:>5} {rps:>8.1f} {bu.percentile(latencies, 50):>7.1f} "
+                  f"{bu.percentile(latencies, 95):>7.1f} {bu.percentile(latencies, 99):>7.1f}")
+
+    await close_async_engine()
+
+def main():
+    parser = argparse.ArgumentParser(description="A/B trip search on a sync Session versus the async router")
+    parser.add_argument("--concurrency", default="1,8,32,128")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--threadpool", type=int, default=40, help="Starlette threadpool size used by sync endpoints")
+    parser.add_argument("--io-latency-ms", type=float, default=0, help="simulated database round trip added to each request")
+    parser.add_argument("--trips", type=int, default=30, help="trips on the searched route")
+    args = parser.parse_args()
+
+    bu.use_temp_database()
+    bu.seed(routes=1, trips_per_route=args.trips)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
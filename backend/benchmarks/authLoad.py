@@ -0,0 +1,61 @@
+import argparse
+import asyncio
+import time
+
+import httpx
+import benchmarks.benchUtil as bu
+from database import close_async_engine
+
+async def timed(samples: list, call):
+    start = time.perf_counter()
+    response = await call()
+    response.raise_for_status()
+    samples.append((time.perf_counter() - start) * 1000)
+
+async def refresh_loop(client, refreshes: int, samples: list):
+    # Rotation issues a fresh cookie, which the client carries into the next call
+    for _ in range(refreshes):
+        await timed(samples, lambda: client.post("/refresh"))
+
+def report(name: str, samples: list, elapsed: float):
+    print(f"{name:>8} {len(samples):>6} {len(samples) / elapsed:>8.1f} {bu.percentile(samples, 50):>7.1f} "
+          f"{bu.percentile(samples, 95):>7.1f} {bu.percentile(samples, 99):>7.1f}")
+
+async def run(args):
+    from main import app
+    emails = [bu.BENCH_EMAIL] + [f"bench{u}@example.com" for u in range(1, args.users)]
+    clients = [httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="https://testserver") for _ in emails]
+    login_ms, refresh_ms = [], []
+
+    # Every user logs in at once, then all of them refresh at once, so each phase is timed on its own
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        timed(login_ms, lambda c=c, e=e: c.post("/login", json={'email': e, 'password': bu.BENCH_PASSWORD}))
+        for c, e in zip(clients, emails)
+    ))
+    login_elapsed = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await asyncio.gather(*(refresh_loop(c, args.refreshes, refresh_ms) for c in clients))
+    refresh_elapsed = time.perf_counter() - started
+
+    for c in clients:
+        await c.aclose()
+
+    print(f"{'call':>8} {'count':>6} {'req/s':>8} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7}")
+    report("login", login_ms, login_elapsed)
+    report("refresh", refresh_ms, refresh_elapsed)
+    await close_async_engine()
+
+def main():
+    parser = argparse.ArgumentParser(description="Login and refresh throughput with concurrent users")
+    parser.add_argument("--users", type=int, default=32)
+    parser.add_argument("--refreshes", type=int, default=20, help="refresh calls per user after logging in")
+    args = parser.parse_args()
+
+    bu.use_temp_database()
+    bu.seed(users=args.users)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+import os
+import tempfile
+
+# authUtil reads these at import time; benchmarks must run without a .env file
+os.environ.setdefault("SECRET_KEY", "benchmark-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "15")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlmodel import Session, text
+import database
+from utils.authUtil import hash_password
+
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "bench-password"
+
+def use_temp_database():
+    # Point the app at a throwaway SQLite file so runs never touch project.db
+    path = os.path.join(tempfile.mkdtemp(prefix="busres-bench-"), "bench.db")
+    database.engine = database.make_engine(f"sqlite:///{path}")
+    database.async_engine = database.make_async_engine(f"sqlite:///{path}")
+    database.create_db_and_tables()
+    return database.engine
+
+def seed(routes: int = 1, trips_per_route: int = 1, seats_per_bus: int = 40, users: int = 1):
+    # Rows are written with the same raw SQL shapes the routers use, so enum columns hold values
+    with Session(database.engine) as session:
+        pw = hash_password(BENCH_PASSWORD)
+        session.exec(
+            text("insert into users(name,email,password,role) values(:n,:e,:p,'USER')"),
+            params=[{'n': f"bench{u}", 'e': BENCH_EMAIL if u == 0 else f"bench{u}@example.com", 'p': pw} for u in range(users)]
+        )
+        session.exec(
+            text("insert into routes(id,start_city,end_city,start_key,end_key,distance_km) values(:id,:s,:e,:s,:e,:d)"),
+            params=[{'id': r + 1, 's': f"city{r}", 'e': f"city{r + 1}", 'd': 100 + r} for r in range(routes)]
+        )
+        bus_count = routes * trips_per_route
+        session.exec(
+            text("insert into buses(id,operator,bus_number,air_type,seat_type,total_seat,rating) values(:id,:o,:n,:a,:s,:t,:r)"),
+            params=[{'id': b + 1, 'o': f"operator{b % 7}", 'n': f"BUS{b:05d}", 'a': "AC" if b % 2 else "NON_AC",
+                     's': "Sleeper" if b % 3 else "Seater", 't': seats_per_bus, 'r': 3 + b % 3} for b in range(bus_count)]
+        )
+        session.exec(
+            text("insert into seats(bus_id,seat_label) values(:b,:l)"),
+            params=[{'b': b + 1, 'l': f"{s // 2 + 1}{'AB'[s % 2]}"} for b in range(bus_count) for s in range(seats_per_bus)]
+        )
+        session.exec(
+            text("insert into trips(id,bus_id,route_id,departure_time,arrival_time,price,seatsAvailable) values(:id,:b,:r,:dt,:at,:p,:sa)"),
+            params=[{'id': b + 1, 'b': b + 1, 'r': b // trips_per_route + 1, 'dt': f"{b % 24:02d}:00:00",
+                     'at': f"{(b + 6) % 24:02d}:30:00", 'p': 300 + (b * 37) % 900, 'sa': seats_per_bus} for b in range(bus_count)]
+        )
+        session.commit()
+
+def logged_in_client(app, email: str = BENCH_EMAIL) -> TestClient:
+    # Auth cookies are marked secure, so the client must talk https to get them back
+    client = TestClient(app, base_url="https://testserver")
+    client.__enter__()
+    response = client.post("/login", json={'email': email, 'password': BENCH_PASSWORD})
+    response.raise_for_status()
+    return client
+
+class StatementCounter:
+    # Every statement sent on either engine; an executemany batch counts once, as it is one round trip
+    def __init__(self):
+        self.count = 0
+        for engine in (database.engine, database.async_engine.sync_engine):
+            event.listen(engine, "before_cursor_execute", self.seen)
+
+    def seen(self, *args):
+        self.count += 1
+
+    def take(self) -> int:
+        taken, self.count = self.count, 0
+        return taken
+
+def percentile(samples: list, pct: float) -> float:
+    ordered = sorted(samples)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
@@ -0,0 +1,101 @@
+import argparse
+import asyncio
+import time
+from datetime import datetime
+
+import benchmarks.benchUtil as bu
+from sqlmodel import Session, select, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+import database
+from database import close_async_engine
+from dto.bookingDto import AddBookingDetail
+from dto.userDto import CurrentUser
+from models.Users import Users
+from models.userRole import UserRole
+
+def legacyAddBooking(detail, session: Session, email: str):
+    # The per-item loop addBooking used before batching: four statements per seat
+    user = session.exec(select(Users).where(Users.email == email)).first()
+    for d in detail:
+        session.execute(text("SELECT id FROM tripseats WHERE seat_id = :s AND trip_id = :t"), params={"s": d.seat_id, "t": d.trip_id}).first()
+        trip_seat_id = session.execute(
+            text("INSERT INTO tripseats(seat_id, trip_id) VALUES (:s, :t) RETURNING id"), params={"s": d.seat_id, "t": d.trip_id}
+        ).one()[0]
+        sl = session.exec(text("select seat_label from seats where id = :sId"), params={"sId": d.seat_id}).first().seat_label
+        session.execute(
+            text("""
+            INSERT INTO bookings(user_id, trip_id, trip_seat_id,seat_label, price, date, booking_status)
+            VALUES (:u, :t, :ts,:sl, :p, :d, 'upcoming')
+            """),
+            params={"u": user.id, "t": d.trip_id, "ts": trip_seat_id, "sl": sl, "p": d.price, "d": datetime.now()}
+        )
+    session.commit()
+
+def reset(engine, seats: int):
+    with Session(engine) as session:
+        session.exec(text("delete from bookings"))
+        session.exec(text("delete from tripseats"))
+        session.exec(text("update trips set seatsAvailable = :n"), params={'n': seats})
+        session.commit()
+
+def benchUser(engine) -> CurrentUser:
+    with Session(engine) as session:
+        user = session.exec(select(Users).where(Users.email == bu.BENCH_EMAIL)).one()
+        return CurrentUser(id=user.id, email=user.email, name=user.name, role=UserRole.USER)
+
+def checkBooked(engine, detail):
+    # A run that books nothing would time an early return, not the batch
+    with Session(engine) as session:
+        booked = session.exec(text("select count(*) from bookings")).one()[0]
+    if booked != len(detail):
+        raise RuntimeError(f"expected {len(detail)} bookings after a run, found {booked}")
+
+def timeLoop(engine, detail, repeats: int, seats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        reset(engine, seats)
+        with Session(engine) as session:
+            start = time.perf_counter()
+            legacyAddBooking(detail, session, bu.BENCH_EMAIL)
+            samples.append((time.perf_counter() - start) * 1000)
+        checkBooked(engine, detail)
+    return bu.percentile(samples, 50)
+
+async def timeBatch(engine, detail, repeats: int, seats: int, user: CurrentUser) -> float:
+    # The router's own handler, awaited on an AsyncSession as FastAPI would call it
+    from routers.bookingRouter import addBooking
+
+    samples = []
+    for _ in range(repeats):
+        reset(engine, seats)
+        async with AsyncSession(database.async_engine) as session:
+            start = time.perf_counter()
+            await addBooking(detail, session, user)
+            samples.append((time.perf_counter() - start) * 1000)
+        checkBooked(engine, detail)
+    return bu.percentile(samples, 50)
+
+async def run(args, engine, sizes, seats):
+    user = benchUser(engine)
+    print(f"{'seats':>5} {'loop p50 ms':>12} {'batch p50 ms':>13} {'speedup':>8}")
+    for size in sizes:
+        detail = [AddBookingDetail(trip_id=1, price=300, seat_id=s) for s in range(1, size + 1)]
+        loop = timeLoop(engine, detail, args.repeats, seats)
+        batch = await timeBatch(engine, detail, args.repeats, seats, user)
+        print(f"{size:>5} {loop:>12.2f} {batch:>13.2f} {loop / batch:>7.1f}x")
+    await close_async_engine()
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare batched addBooking with the old per-seat loop")
+    parser.add_argument("--sizes", default="1,2,4,6,10,20,40", help="comma separated group sizes")
+    parser.add_argument("--repeats", type=int, default=30)
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",")]
+    seats = max(sizes)
+
+    engine = bu.use_temp_database()
+    bu.seed(routes=1, trips_per_route=1, seats_per_bus=seats)
+    asyncio.run(run(args, engine, sizes, seats))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import benchmarks.benchUtil as bu
+from sqlmodel import Session, text
+
+def main():
+    parser = argparse.ArgumentParser(description="Fire concurrent bookings at a few hot seats and check nothing is oversold")
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--hot-seats", type=int, default=4, help="number of seats every request competes for")
+    parser.add_argument("--seats-per-request", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    engine = bu.use_temp_database()
+    bu.seed(routes=1, trips_per_route=1, seats_per_bus=40)
+
+    from main import app
+    client = bu.logged_in_client(app)
+    rng = random.Random(args.seed)
+    payloads = [
+        [{'trip_id': 1, 'price': 300, 'seat_id': s} for s in rng.sample(range(1, args.hot_seats + 1), args.seats_per_request)]
+        for _ in range(args.requests)
+    ]
+
+    def book(payload):
+        start = time.perf_counter()
+        response = client.post("/booking/add", json=payload)
+        return response.status_code, time.perf_counter() - start
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        results = list(pool.map(book, payloads))
+    elapsed = time.perf_counter() - started
+
+    statuses = Counter(code for code, _ in results)
+    latencies = [lat * 1000 for _, lat in results]
+    print(f"{args.requests} requests on {args.threads} threads in {elapsed:.2f}s ({args.requests / elapsed:.1f} req/s)")
+    print(f"latency ms p50={bu.percentile(latencies, 50):.1f} p95={bu.percentile(latencies, 95):.1f} p99={bu.percentile(latencies, 99):.1f}")
+    print("status codes:", dict(sorted(statuses.items())))
+
+    with Session(engine) as session:
+        doubled = session.exec(text("select seat_id, count(*) from tripseats where trip_id = 1 group by seat_id having count(*) > 1")).all()
+        held = session.exec(text("select count(*) from tripseats where trip_id = 1")).one()[0]
+        booked = session.exec(text("select count(*) from bookings where trip_id = 1 and booking_status = 'upcoming'")).one()[0]
+        available = session.exec(text("select seatsAvailable from trips where id = 1")).one()[0]
+
+    succeeded_seats = statuses[200] * args.seats_per_request
+    problems = []
+    if doubled:
+        problems.append(f"seats held more than once: {doubled}")
+    if held > args.hot_seats or held != succeeded_seats or booked != held:
+        problems.append(f"held={held} booked={booked} successful seats={succeeded_seats} hot seats={args.hot_seats}")
+    if available != 40 - held:
+        problems.append(f"seatsAvailable={available}, expected {40 - held}")
+
+    if problems:
+        print("OVERSOLD:", "; ".join(problems))
+        sys.exit(1)
+    print(f"OK: {held} of {args.hot_seats} hot seats sold exactly once")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+import argparse
+import random
+import string
+import time
+
+import benchmarks.benchUtil as bu
+from utils.cityIndex import CityIndex
+
+# Per-keystroke latency of city autocomplete on a synthetic index. Every prefix of a sampled
+# name is queried, with the last letter mistyped, so the fuzzy walk runs on each call.
+
+def city_names(count: int, rng: random.Random) -> list:
+    names = set()
+    while len(names) < count:
+        name = "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 12)))
+        if rng.random() < 0.2:
+            name += " " + "".join(rng.choices(string.ascii_lowercase, k=5))
+        names.add(name)
+    return sorted(names)
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency of in-memory city suggestions")
+    parser.add_argument("--cities", type=int, default=5000)
+    parser.add_argument("--samples", type=int, default=300, help="names whose prefixes are typed out")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    names = city_names(args.cities, rng)
+    index = CityIndex("bench_cities")
+    started = time.perf_counter()
+    index.load(zip(names, names[1:] + names[:1]))
+    print(f"indexed {len(names)} cities in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    samples = []
+    for name in rng.sample(names, args.samples):
+        for length in range(1, len(name) + 1):
+            typed = name[:length - 1] + ("z" if length > 2 else name[length - 1])
+            started = time.perf_counter()
+            index.suggest(typed)
+            samples.append((time.perf_counter() - started) * 1000)
+
+    print(f"{len(samples)} keystrokes")
+    print(f"p50 {bu.percentile(samples, 50):.2f} ms  p95 {bu.percentile(samples, 95):.2f} ms  p99 {bu.percentile(samples, 99):.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+import argparse
+import random
+import time
+from collections import namedtuple
+
+import benchmarks.benchUtil as bu
+from utils.connectionGraph import ConnectionGraph
+
+# Times connection search on a synthetic network held only in memory, the way the endpoint
+# runs it once the graph is loaded. Rows have the shape connectionGraph.LOAD_TRIPS reads.
+
+TripRow = namedtuple("TripRow", "id route_id start_city end_city departure_time arrival_time price travel_date")
+
+def network(cities: int, routes: int, trips_per_route: int, rng: random.Random) -> list:
+    pairs = set()
+    while len(pairs) < routes:
+        a, b = rng.sample(range(cities), 2)
+        pairs.add((a, b))
+    rows = []
+    for route_id, (a, b) in enumerate(sorted(pairs), start=1):
+        hours = rng.randint(2, 10)
+        for _ in range(trips_per_route):
+            departs = rng.randrange(0, 24 * 60, 15)
+            arrives = (departs + hours * 60 + rng.randrange(0, 60, 15)) % (24 * 60)
+            rows.append(TripRow(len(rows) + 1, route_id, f"city{a}", f"city{b}",
+                                f"{departs // 60:02d}:{departs % 60:02d}:00", f"{arrives // 60:02d}:{arrives % 60:02d}:00",
+                                rng.randint(200, 1500), None))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency of in-memory multi-leg connection search")
+    parser.add_argument("--cities", type=int, default=500)
+    parser.add_argument("--routes", type=int, default=3000)
+    parser.add_argument("--trips-per-route", type=int, default=4)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--max-legs", type=int, default=3)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--sort", choices=["duration", "price"], default="duration")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    rows = network(args.cities, args.routes, args.trips_per_route, rng)
+
+    graph = ConnectionGraph("bench_connections")
+    started = time.perf_counter()
+    graph.add_trips(rows)
+    print(f"loaded {len(rows)} trips on {args.routes} routes in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+    samples, found = [], 0
+    for _ in range(args.queries):
+        a, b = rng.sample(range(args.cities), 2)
+        started = time.perf_counter()
+        results = graph.search(f"city{a}", f"city{b}", max_legs=args.max_legs, k=args.k, sort=args.sort)
+        samples.append((time.perf_counter() - started) * 1000)
+        found += bool(results)
+
+    print(f"{args.queries} queries, {found} with an itinerary")
+    print(f"p50 {bu.percentile(samples, 50):.2f} ms  p95 {bu.percentile(samples, 95):.2f} ms  p99 {bu.percentile(samples, 99):.2f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+import argparse
+import math
+import random
+import time
+from array import array
+from datetime import date, datetime, timedelta
+from itertools import islice
+
+import benchmarks.benchUtil  # noqa: F401  (env defaults authUtil needs)
+from sqlmodel import Session, text
+import database
+from models.Users import Users
+from models.Buses import Buses
+from models.Routes import Routes
+from models.Seats import Seats
+from models.Trips import Trips
+from models.TripSeats import TripSeats
+from models.Bookings import Bookings
+from models.busType import BusAirType, BusSeatType
+from models.bookingStatus import BookingStatus
+from models.userRole import UserRole
+from utils.authUtil import hash_password
+from utils.cityUtil import normalize_city
+from utils.seatLayout import generate_seat_labels
+from utils.versionStamp import bus_versions
+from utils.connectionGraph import connection_graph
+from utils.cityIndex import city_index
+from utils.refCache import invalidation_bus, shares_invalidations
+
+# Bulk synthetic data for scale testing: routes between real cities, buses with seat layouts,
+# trips (optionally dated over a window of days), users, and tripseats with their bookings.
+# Rows are streamed from generators in executemany batches, one commit per batch, so memory
+# stays flat however many bookings are asked for. The same --seed always gives the same data.
+#
+#   python -m benchmarks.generateData --url sqlite:///./scale.db --routes 500 --days 30 --bookings 2000000
+#
+# Trip ETags follow the database, but a server already running on the same database keeps its
+# bus layouts, city index and connection graph until it is restarted, unless both this command
+# and the server were started with the same REF_CACHE_INVALIDATION_FILE.
+
+CITIES = [
+    "mangalore", "bangalore", "mysore", "hubli", "belgaum", "udupi", "shimoga", "davangere",
+    "bellary", "gulbarga", "bijapur", "hassan", "chikmagalur", "karwar", "madikeri", "tumkur",
+    "chennai", "coimbatore", "madurai", "salem", "trichy", "tirunelveli", "vellore", "pondicherry",
+    "hyderabad", "vijayawada", "visakhapatnam", "tirupati", "kurnool", "warangal", "nellore", "guntur",
+    "kochi", "trivandrum", "kozhikode", "thrissur", "kannur", "kollam", "alappuzha", "palakkad",
+    "mumbai", "pune", "nashik", "kolhapur", "nagpur", "aurangabad", "solapur", "goa",
+    "ahmedabad", "surat", "vadodara", "rajkot", "indore", "bhopal", "jaipur", "udaipur",
+    "delhi", "agra", "lucknow", "varanasi", "chandigarh", "amritsar", "dehradun", "manali",
+]
+OPERATORS = [
+    "KSRTC", "VRL Travels", "SRS Travels", "Orange Tours", "Sugama Tourist", "Durgamba Motors",
+    "National Travels", "Kallada Travels", "Neeta Tours", "Paulo Travels", "Jabbar Travels", "IntrCity SmartBus",
+]
+SEAT_COUNTS = {BusSeatType.SLEEPER: (30, 32, 36), BusSeatType.SEATER: (36, 40, 44, 49)}
+PASSWORD = "generated-password"
+
+PLACEHOLDERS = {'qmark': "?", 'format': "%s", 'pyformat': "%s"}
+
+def insert_sql(model, columns: list, paramstyle: str) -> str:
+    # Column names come from the model, values go in raw like the routers write them (enum values).
+    # Positional driver SQL skips SQLAlchemy's per-row parameter processing, most of the cost at this volume.
+    table = model.__table__
+    missing = [c for c in columns if c not in table.c]
+    if missing:
+        raise ValueError(f"{table.name} has no column(s) {missing}")
+    return f"insert into {table.name}({', '.join(columns)}) values({', '.join([PLACEHOLDERS[paramstyle]] * len(columns))})"
+
+def next_id(session: Session, model) -> int:
+    return session.exec(text(f"select coalesce(max(id), 0) + 1 from {model.__table__.name}")).one()[0]
+
+class Loader:
+    # Writes each stream in batches and keeps per-table row counts and elapsed time for the report
+    def __init__(self, batch: int):
+        self.batch = batch
+        self.report = []
+
+    def stream(self, models: list, columns: list, rows):
+        # rows yields one dict per model (a tuple when several tables are written together, parents first)
+        paramstyle = database.engine.dialect.paramstyle
+        statements = [(insert_sql(model, cols, paramstyle), cols) for model, cols in zip(models, columns)]
+        written = 0
+        started = time.perf_counter()
+        with database.engine.connect() as conn:
+            while True:
+                chunk = list(islice(rows, self.batch))
+                if not chunk:
+                    break
+                for i, (statement, cols) in enumerate(statements):
+                    parts = [row[i] for row in chunk] if len(statements) > 1 else chunk
+                    conn.exec_driver_sql(statement, [tuple(map(part.__getitem__, cols)) for part in parts])
+                conn.commit()
+                written += len(chunk)
+        elapsed = time.perf_counter() - started
+        for model in models:
+            self.report.append((model.__table__.name, written, elapsed))
+            print(f"{model.__table__.name:<10} {written:>10} rows {elapsed:>8.2f} s {written / max(elapsed, 1e-9):>12,.0f} rows/s")
+        return written
+
+def city_coordinates(rng: random.Random) -> dict:
+    # A made-up map about 2000 km across; distances between cities follow from it
+    return {city: (rng.uniform(0, 2000), rng.uniform(0, 2000)) for city in CITIES}
+
+def route_rows(session: Session, args, rng: random.Random, routes: list):
+    coords = city_coordinates(rng)
+    taken = {tuple(r) for r in session.exec(text("select start_key, end_key from routes")).all()}
+    pairs = [(a, b) for a in CITIES for b in CITIES if a != b and (a, b) not in taken]
+    rng.shuffle(pairs)
+    route_id = next_id(session, Routes)
+    for a, b in pairs[:args.routes]:
+        (ax, ay), (bx, by) = coords[a], coords[b]
+        # Roads are longer than the straight line
+        distance = max(30, int(math.hypot(ax - bx, ay - by) * 1.3))
+        routes.append((route_id, distance))
+        yield {'id': route_id, 'start_city': a.title(), 'end_city': b.title(),
+               'start_key': normalize_city(a), 'end_key': normalize_city(b), 'distance_km': distance}
+        route_id += 1
+
+def bus_rows(session: Session, count: int, rng: random.Random, buses: list):
+    bus_id = next_id(session, Buses)
+    for _ in range(count):
+        seat_type = rng.choice(list(BusSeatType))
+        total = rng.choice(SEAT_COUNTS[seat_type])
+        buses.append((bus_id, seat_type, total))
+        yield {
+            'id': bus_id,
+            'operator': rng.choice(OPERATORS),
+            'bus_number': f"KA-{rng.randint(1, 70):02d}-{rng.choice('ABCDEFGHJK')}{rng.choice('ABCDEFGHJK')}-{bus_id:06d}",
+            'air_type': rng.choice(list(BusAirType)).value,
+            'seat_type': seat_type.value,
+            'total_seat': total,
+            'rating': rng.randint(1, 5),
+        }
+        bus_id += 1
+
+def seat_rows(session: Session, buses: list, first_seats: dict):
+    seat_id = next_id(session, Seats)
+    for bus_id, seat_type, total in buses:
+        first_seats[bus_id] = seat_id
+        for label in generate_seat_labels(total, seat_type):
+            yield {'id': seat_id, 'bus_id': bus_id, 'seat_label': label}
+            seat_id += 1
+
+def trip_rows(session: Session, args, rng: random.Random, routes: list, buses: list, trips: list, booked: array):
+    # One service per bus: a fixed route, departure and fare, repeated on every day of the window.
+    # The seats each trip will get booked are drawn here so seatsAvailable matches the tripseats.
+    trip_id = next_id(session, Trips)
+    days = [args.start + timedelta(days=d) for d in range(args.days)] or [None]
+    capacity = sum(total for _, _, total in buses) * len(days)
+    occupancy = min(1.0, args.bookings / capacity) if capacity else 0.0
+    remaining = args.bookings
+    if args.bookings > capacity:
+        print(f"only {capacity} seats on generated trips, booking all of them")
+    services = iter(buses)
+    for route_id, distance in routes:
+        for _ in range(args.trips_per_route):
+            bus_id, seat_type, total = next(services)
+            departs = rng.randrange(0, 24 * 60, 15)
+            arrives = (departs + int(distance / 50 * 60) // 5 * 5 + rng.randrange(0, 60, 15)) % (24 * 60)
+            price = max(150, int(round(distance * rng.uniform(1.2, 2.4) * (1.3 if seat_type == BusSeatType.SLEEPER else 1), -1)))
+            for day in days:
+                count = min(total, remaining, int(total * occupancy * rng.uniform(0.5, 1.5) + 0.5))
+                remaining -= count
+                trips.append((trip_id, bus_id, seat_type, total, price, day, departs))
+                booked.append(count)
+                yield {
+                    'id': trip_id,
+                    'bus_id': bus_id,
+                    'route_id': route_id,
+                    'departure_time': f"{departs // 60:02d}:{departs % 60:02d}:00",
+                    'arrival_time': f"{arrives // 60:02d}:{arrives % 60:02d}:00",
+                    'price': price,
+                    'seatsAvailable': total - count,
+                    'travel_date': str(day) if day else None,
+                }
+                trip_id += 1
+
+def user_rows(session: Session, count: int, first_users: list):
+    user_id = next_id(session, Users)
+    first_users.append(user_id)
+    password = hash_password(PASSWORD)
+    for _ in range(count):
+        yield {'id': user_id, 'name': f"user{user_id}", 'email': f"user{user_id}@example.com",
+               'password': password, 'role': UserRole.USER.name}
+        user_id += 1
+
+def booking_rows(session: Session, args, rng: random.Random, trips: list, booked: array, first_seats: dict, first_user: int):
+    # (tripseat, booking) pairs; each booking points at the tripseat written in the same batch
+    trip_seat_id = next_id(session, TripSeats)
+    booking_id = next_id(session, Bookings)
+    today = date.today()
+    now = datetime.now()
+    layouts = {}
+    for (trip_id, bus_id, seat_type, total, price, day, departs), count in zip(trips, booked):
+        if not count:
+            continue
+        leaves = datetime.combine(day, datetime.min.time()) + timedelta(minutes=departs) if day else now
+        status = (BookingStatus.COMPLETED if day and day < today else BookingStatus.UPCOMING).value
+        # Same layout the seats were written with
+        if (seat_type, total) not in layouts:
+            layouts[seat_type, total] = generate_seat_labels(total, seat_type)
+        labels = layouts[seat_type, total]
+        for seat in rng.sample(range(total), count):
+            yield (
+                {'id': trip_seat_id, 'trip_id': trip_id, 'seat_id': first_seats[bus_id] + seat},
+                {
+                    'id': booking_id,
+                    'user_id': first_user + rng.randrange(args.users),
+                    'trip_id': trip_id,
+                    'trip_seat_id': trip_seat_id,
+                    'seat_label': labels[seat],
+                    'price': price,
+                    'date': leaves - timedelta(minutes=rng.randrange(60, 30 * 24 * 60)),
+                    'booking_status': status,
+                },
+            )
+            trip_seat_id += 1
+            booking_id += 1
+
+def generate(args) -> Loader:
+    rng = random.Random(args.seed)
+    loader = Loader(args.batch)
+    routes, buses, trips, first_seats, first_users = [], [], [], {}, []
+    booked = array('H')
+
+    with Session(database.engine) as session:
+        loader.stream([Routes], [['id', 'start_city', 'end_city', 'start_key', 'end_key', 'distance_km']], route_rows(session, args, rng, routes))
+        if len(routes) < args.routes:
+            print(f"only {len(routes)} new city pairs left, generating {len(routes)} routes")
+        loader.stream([Buses], [['id', 'operator', 'bus_number', 'air_type', 'seat_type', 'total_seat', 'rating']],
+                      bus_rows(session, len(routes) * args.trips_per_route, rng, buses))
+        loader.stream([Seats], [['id', 'bus_id', 'seat_label']], seat_rows(session, buses, first_seats))
+        loader.stream([Trips], [['id', 'bus_id', 'route_id', 'departure_time', 'arrival_time', 'price', 'seatsAvailable', 'travel_date']],
+                      trip_rows(session, args, rng, routes, buses, trips, booked))
+        loader.stream([Users], [['id', 'name', 'email', 'password', 'role']], user_rows(session, args.users, first_users))
+        loader.stream(
+            [TripSeats, Bookings],
+            [['id', 'trip_id', 'seat_id'], ['id', 'user_id', 'trip_id', 'trip_seat_id', 'seat_label', 'price', 'date', 'booking_status']],
+            booking_rows(session, args, rng, trips, booked, first_seats, first_users[0]),
+        )
+    return loader
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate bulk synthetic data for scale testing")
+    parser.add_argument("--url", default=database.DATABASE_URL, help="database to fill, default DATABASE_URL")
+    parser.add_argument("--routes", type=int, default=200)
+    parser.add_argument("--trips-per-route", type=int, default=4, help="daily services per route, one bus each")
+    parser.add_argument("--days", type=int, default=0, help="dated trips for this many days; 0 writes undated trips")
+    parser.add_argument("--start", type=date.fromisoformat, default=date.today(), help="first travel day (YYYY-MM-DD)")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--bookings", type=int, default=100000, help="booked seats, capped by the seats on generated trips")
+    parser.add_argument("--batch", type=int, default=5000, help="rows per executemany and commit")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    if args.bookings and args.users < 1:
+        parser.error("bookings need at least one user")
+
+    database.engine = database.make_engine(args.url)
+    database.create_db_and_tables()
+
+    started = time.perf_counter()
+    loader = generate(args)
+    elapsed = time.perf_counter() - started
+    total = sum(rows for _, rows, _ in loader.report)
+    print(f"{total} rows in {elapsed:.2f} s, {total / max(elapsed, 1e-9):,.0f} rows/s overall")
+    print(f"users log in as userN@example.com / {PASSWORD}")
+
+    bus_versions.bump(None)
+    connection_graph.invalidate()
+    invalidation_bus.publish(city_index.namespace, None)
+    if not shares_invalidations():
+        print("REF_CACHE_INVALIDATION_FILE is not set: restart any server running on this database")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import argparse
+import sys
+from collections import defaultdict
+
+import benchmarks.benchUtil as bu
+from sqlalchemy import event
+import database
+from routers.authApi import known_users
+from utils.refCache import caches
+
+# Drives every router endpoint against a seeded SQLite database, captures the statements each one
+# issues, and runs EXPLAIN QUERY PLAN on them. Any full-table SCAN is a regression.
+
+def capture(engine, sink):
+    def before(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE"):
+            sink.append((statement, parameters))
+    event.listen(engine, "before_cursor_execute", before)
+
+def endpoint_calls(client):
+    # (label, callable) pairs covering every query shape in the routers
+    return [
+        ("GET /Profile", lambda: client.get("/Profile")),
+        ("GET /routes/{id}", lambda: client.get("/routes/2")),
+        ("GET /routes/", lambda: client.get("/routes/", params={'start_city': "city1", 'end_city': "city2"})),
+        ("GET /buses/{id}", lambda: client.get("/buses/3")),
+        ("GET /buses/number/{n}", lambda: client.get("/buses/number/BUS00004")),
+        ("GET /trips/get", lambda: client.get("/trips/get", params={'start_city': "city0", 'end_city': "city1"})),
+        ("GET /trips/get?travel_date", lambda: client.get("/trips/get", params={'start_city': "city0", 'end_city': "city1", 'travel_date': "2026-01-05", 'sort': "price_low"})),
+        ("GET /seat/{busId}", lambda: client.get("/seat/1")),
+        ("GET /trips/{id}/seatmap", lambda: client.get("/trips/1/seatmap")),
+        ("POST /booking/add", lambda: client.post("/booking/add", json=[{'trip_id': 1, 'price': 300, 'seat_id': 1}, {'trip_id': 1, 'price': 300, 'seat_id': 2}])),
+        ("GET /tripSeat/{tripId}", lambda: client.get("/tripSeat/1")),
+        ("GET /booking/get", lambda: client.get("/booking/get", params={'limit': 1})),
+        ("GET /booking/get?status", lambda: client.get("/booking/get", params={'status': "upcoming"})),
+        ("POST /booking/cancel/{id}", lambda: client.post("/booking/cancel/1")),
+        ("POST /refresh", lambda: client.post("/refresh")),
+    ]
+
+def scans(plan_rows):
+    # SQLite reports a full pass as "SCAN <table>"; index seeks show up as "SEARCH"
+    return [row[-1] for row in plan_rows if row[-1].startswith("SCAN ") and "CONSTANT ROW" not in row[-1]]
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail if any router query plans a full table scan")
+    parser.add_argument("--verbose", action="store_true", help="print every plan, not just the failures")
+    args = parser.parse_args()
+
+    engine = bu.use_temp_database()
+    # Enough rows that the planner has a reason to prefer indexes
+    bu.seed(routes=20, trips_per_route=5, seats_per_bus=40, users=50)
+
+    from main import app
+    client = bu.logged_in_client(app)
+    statements = []
+    capture(engine, statements)
+    capture(database.async_engine.sync_engine, statements)
+
+    per_endpoint = defaultdict(list)
+    for label, call in endpoint_calls(client):
+        # Cold caches, so lookups that normally hit memory still reach the database
+        known_users.clear()
+        for cache in caches.values():
+            cache.drop(None)
+        statements.clear()
+        response = call()
+        if response.status_code >= 400:
+            print(f"{label}: HTTP {response.status_code} {response.text}")
+            sys.exit(1)
+        per_endpoint[label] = list(statements)
+
+    failures = 0
+    with engine.connect() as conn:
+        raw = conn.connection.dbapi_connection
+        for label, captured in per_endpoint.items():
+            for statement, parameters in captured:
+                plan = raw.execute("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+                bad = scans(plan)
+                failures += bool(bad)
+                if bad or args.verbose:
+                    print(f"{'FAIL' if bad else 'ok  '} {label}: {' '.join(statement.split())[:120]}")
+                    for row in plan:
+                        print(f"       {row[-1]}")
+
+    total = sum(len(v) for v in per_endpoint.values())
+    print(f"{total} statements across {len(per_endpoint)} endpoints, {failures} with full scans")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
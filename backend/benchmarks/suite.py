@@ -0,0 +1,194 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+from collections import defaultdict
+
+import benchmarks.benchUtil as bu
+from sqlmodel import Session, text
+import database
+
+# End-to-end benchmark of the main user flows, in-process against a seeded SQLite database.
+# Each scenario reports latency percentiles, requests per second and SQL statements per request.
+# --save writes the numbers as a JSON baseline; --baseline compares a run against one and exits
+# non-zero when a scenario got slower, lost throughput or started issuing more statements.
+
+def scenarios(args):
+    # (name, iterations, setup, call); setup runs once before timing and fills in ctx for the calls
+    def search(ctx, i):
+        r = ctx['rng'].randrange(args.routes)
+        return ctx['client'].get("/trips/get", params={'start_city': f"city{r}", 'end_city': f"city{r + 1}"})
+
+    def search_filtered(ctx, i):
+        r = ctx['rng'].randrange(args.routes)
+        return ctx['client'].get("/trips/get", params={
+            'start_city': f"city{r}", 'end_city': f"city{r + 1}", 'air_type': "AC",
+            'min_price': 400, 'min_seats': 2, 'sort': "price_low", 'limit': 3,
+        })
+
+    def seatmap(ctx, i):
+        return ctx['client'].get(f"/trips/{ctx['rng'].choice(ctx['trips'])}/seatmap")
+
+    def seats(ctx, i):
+        # Only trips with bookings: /tripSeat answers 404 for a trip with none
+        trip = ctx['rng'].choice(sorted(ctx['booked']))
+        ctx['client'].get(f"/seat/{trip}")
+        return ctx['client'].get(f"/tripSeat/{trip}")
+
+    def connections(ctx, i):
+        a = ctx['rng'].randrange(args.routes - 1)
+        return ctx['client'].get("/routes/connections", params={'start_city': f"city{a}", 'end_city': f"city{a + 2}", 'min_layover': 0, 'max_layover': 1440})
+
+    def suggest(ctx, i):
+        return ctx['client'].get("/routes/cities/suggest", params={'q': f"cit{ctx['rng'].randrange(10)}"})
+
+    def booking(ctx, i):
+        trip = ctx['trips'][i % len(ctx['trips'])]
+        taken = [ctx['free'][trip].pop() for _ in range(args.seats_per_booking)]
+        ctx['booked'].add(trip)
+        return ctx['client'].post("/booking/add", json=[{'trip_id': trip, 'price': 300, 'seat_id': s} for s in taken])
+
+    def history(ctx, i):
+        return ctx['client'].get("/booking/get", params={'limit': 20})
+
+    def cancel(ctx, i):
+        return ctx['client'].post(f"/booking/cancel/{ctx['bookings'].pop()}")
+
+    def login(ctx, i):
+        return ctx['client'].post("/login", json={'email': bu.BENCH_EMAIL, 'password': bu.BENCH_PASSWORD})
+
+    def load_bookings(ctx):
+        with Session(database.engine) as session:
+            ctx['bookings'] = [row[0] for row in session.exec(text("select id from bookings order by id")).all()]
+
+    n = args.iterations
+    return [
+        ("login", max(1, n // 10), None, login),
+        ("trip_search", n, None, search),
+        ("trip_search_filtered", n, None, search_filtered),
+        ("seatmap", n, None, seatmap),
+        ("connections", n, None, connections),
+        ("city_suggest", n, None, suggest),
+        ("booking", n, None, booking),
+        ("seat_and_tripseat", n, None, seats),
+        ("history", n, None, history),
+        ("cancel", n, load_bookings, cancel),
+    ]
+
+def run(args) -> dict:
+    bu.use_temp_database()
+    bu.seed(routes=args.routes, trips_per_route=args.trips_per_route, seats_per_bus=args.seats_per_bus, users=args.users)
+
+    from main import app
+    client = bu.logged_in_client(app)
+    counter = bu.StatementCounter()
+
+    with Session(database.engine) as session:
+        free = defaultdict(list)
+        for trip, seat in session.exec(text("select t.id, s.id from trips t join seats s on s.bus_id = t.bus_id")).all():
+            free[trip].append(seat)
+    ctx = {'client': client, 'rng': random.Random(args.seed), 'trips': sorted(free), 'free': free, 'booked': set()}
+
+    results = {}
+    for name, iterations, setup, call in scenarios(args):
+        if args.only and name not in args.only:
+            continue
+        if setup:
+            setup(ctx)
+        # Warm-up calls are not timed: first hits fill caches and compile statements
+        for i in range(args.warmup if name not in ("booking", "cancel") else 0):
+            call(ctx, i)
+        counter.take()
+
+        samples = []
+        started = time.perf_counter()
+        for i in range(iterations):
+            begin = time.perf_counter()
+            response = call(ctx, i)
+            samples.append((time.perf_counter() - begin) * 1000)
+            if response.status_code >= 400:
+                print(f"{name}: HTTP {response.status_code} {response.text}")
+                sys.exit(2)
+        elapsed = time.perf_counter() - started
+
+        results[name] = {
+            'requests': iterations,
+            'rps': round(iterations / elapsed, 1),
+            'p50_ms': round(bu.percentile(samples, 50), 3),
+            'p95_ms': round(bu.percentile(samples, 95), 3),
+            'p99_ms': round(bu.percentile(samples, 99), 3),
+            'statements_per_request': round(counter.take() / iterations, 2),
+        }
+
+    client.__exit__(None, None, None)
+    return results
+
+def report(results: dict):
+    print(f"{'scenario':<22} {'reqs':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'sql/req':>8}")
+    for name, r in results.items():
+        print(f"{name:<22} {r['requests']:>5} {r['rps']:>8.1f} {r['p50_ms']:>8.2f} {r['p95_ms']:>8.2f} "
+              f"{r['p99_ms']:>8.2f} {r['statements_per_request']:>8.2f}")
+
+def regressions(results: dict, baseline: dict, tolerance: float, floor_ms: float) -> list:
+    # Latency may grow by the tolerance plus a small absolute floor (sub-millisecond noise),
+    # throughput may drop by the tolerance, and the statement count must not grow at all
+    found = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        for metric in ("p50_ms", "p95_ms", "p99_ms"):
+            limit = base[metric] * (1 + tolerance) + floor_ms
+            if r[metric] > limit:
+                found.append(f"{name}: {metric} {r[metric]:.2f} > {limit:.2f} (baseline {base[metric]:.2f})")
+        if r['rps'] < base['rps'] / (1 + tolerance):
+            found.append(f"{name}: rps {r['rps']:.1f} < {base['rps'] / (1 + tolerance):.1f} (baseline {base['rps']:.1f})")
+        if r['statements_per_request'] > base['statements_per_request']:
+            found.append(f"{name}: statements/request {r['statements_per_request']} > {base['statements_per_request']}")
+    return found
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the main flows and compare against a saved baseline")
+    parser.add_argument("--iterations", type=int, default=200, help="timed requests per scenario (login runs a tenth)")
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--routes", type=int, default=20)
+    parser.add_argument("--trips-per-route", type=int, default=5)
+    parser.add_argument("--seats-per-bus", type=int, default=40)
+    parser.add_argument("--seats-per-booking", type=int, default=2)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--only", nargs="*", help="run only these scenarios; seat_and_tripseat, history and cancel need booking")
+    parser.add_argument("--save", help="write results to this JSON file as the new baseline")
+    parser.add_argument("--baseline", help="compare against this JSON baseline and fail on regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed relative slowdown, 0.25 = 25%%")
+    parser.add_argument("--floor-ms", type=float, default=0.5, help="latency growth always allowed, absorbs timer noise")
+    args = parser.parse_args()
+
+    if args.iterations * args.seats_per_booking > args.routes * args.trips_per_route * args.seats_per_bus:
+        parser.error("not enough seats in the dataset for that many bookings")
+
+    results = run(args)
+    report(results)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                'meta': {'python': platform.python_version(), 'machine': platform.machine(),
+                         'args': {k: v for k, v in vars(args).items() if k not in ("save", "baseline")}},
+                'scenarios': results,
+            }, f, indent=2)
+        print(f"baseline written to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['scenarios']
+        found = regressions(results, baseline, args.tolerance, args.floor_ms)
+        for line in found:
+            print(f"REGRESSION {line}")
+        print(f"{len(found)} regression(s) against {args.baseline}")
+        sys.exit(1 if found else 0)
+
+if __name__ == "__main__":
+    main()
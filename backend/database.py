@@ -1,16 +1,93 @@
-from sqlmodel import Session,create_engine,SQLModel
+from sqlmodel import Session,create_engine,SQLModel,text
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 import os
 from dotenv import load_dotenv
+# Register every table model so metadata and relationship names resolve even if no router imports them
+from models import Users, RefreshToken, Buses, Routes, Schedules, Seats, Trips, TripSeats, Bookings  # noqa: F401
+from migrations import run_migrations
 
 load_dotenv()
 
-DATABASE_URL = "sqlite:///./project.db"
-# DATABASE_URL = os.getenv("DATABASE_URL")
-engine = create_engine(DATABASE_URL,echo=True)
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./project.db")
+
+def env_flag(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run alongside the single writer; NORMAL sync is durable enough under WAL
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', 5000))}")
+    cursor.execute(f"PRAGMA mmap_size={int(os.getenv('SQLITE_MMAP_SIZE', 256 * 1024 * 1024))}")
+    cursor.close()
+
+def engine_options(url: str) -> dict:
+    options = {'echo': env_flag("DB_ECHO", False)}
+
+    # In-memory SQLite lives on a single connection, so pool sizing does not apply there
+    url = make_url(url)
+    if not (url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")):
+        options.update(
+            pool_size=int(os.getenv("DB_POOL_SIZE", 10)),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", 20)),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", 1800)),
+            pool_pre_ping=env_flag("DB_POOL_PRE_PING", True),
+        )
+    return options
+
+def make_engine(url: str = DATABASE_URL):
+    options = engine_options(url)
+
+    if url.startswith("sqlite"):
+        # Sessions are handed across FastAPI's threadpool workers
+        options['connect_args'] = {'check_same_thread': False}
+        new_engine = create_engine(url, **options)
+        event.listen(new_engine, "connect", set_sqlite_pragmas)
+        return new_engine
+
+    return create_engine(url, **options)
+
+def async_url(url: str) -> str:
+    # Same database, async driver: aiosqlite locally, aiomysql in production
+    url = make_url(url)
+    drivers = {'sqlite': "aiosqlite", 'mysql': "aiomysql"}
+    backend = url.get_backend_name()
+    if backend not in drivers:
+        raise ValueError(f"DATABASE_URL backend '{backend}' is not supported; use one of: {', '.join(sorted(drivers))}")
+    return url.set(drivername=f"{backend}+{drivers[backend]}").render_as_string(hide_password=False)
+
+def make_async_engine(url: str = DATABASE_URL):
+    new_engine = create_async_engine(async_url(url), **engine_options(url))
+    if url.startswith("sqlite"):
+        event.listen(new_engine.sync_engine, "connect", set_sqlite_pragmas)
+    return new_engine
+
+engine = make_engine()
+async_engine = make_async_engine()
 
 def getSession():
     with Session(engine) as session:
         yield session
 
+async def getAsyncSession():
+    # expire_on_commit off: routers read values after commit without another round trip
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
+        yield session
+
+async def close_async_engine():
+    # aiosqlite runs a worker thread per pooled connection; dispose so the process can exit
+    await async_engine.dispose()
+
 def create_db_and_tables():
-    SQLModel.metadata.create_all(engine)
\ No newline at end of file
+    SQLModel.metadata.create_all(engine)
+    
+    # Kept for anything still reading the view; the routers query routes directly
+    create_view = "CREATE VIEW IF NOT EXISTS" if engine.dialect.name == "sqlite" else "CREATE OR REPLACE VIEW"
+    with engine.begin() as conn:
+        conn.execute(text(f"{create_view} route_details_view AS SELECT id, start_city, end_city, distance_km FROM routes"))
+    
+    run_migrations(engine)
@@ -1,7 +1,8 @@
 from pydantic import BaseModel
 from models.bookingStatus import BookingStatus
 from models.busType import BusAirType, BusSeatType
-from datetime import datetime,time
+from datetime import date,datetime,time
+from typing import Optional
 
 class AddBookingDetail(BaseModel):
     trip_id: int
@@ -20,4 +21,5 @@ class CompleteBookingDetail(BaseModel):
     date: datetime
     departure_time: time
     arrival_time: time
+    travel_date: Optional[date] = None
     price: int
\ No newline at end of file
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from typing import Optional
 from models.busType import BusAirType,BusSeatType
 
 class GetBusDetail(BaseModel):
@@ -16,4 +17,5 @@ class AddBusDetail(BaseModel):
     air_type: BusAirType
     seat_type: BusSeatType
     total_seat: int
-    rating: float
\ No newline at end of file
+    rating: float
+    seat_columns: Optional[int] = None
\ No newline at end of file
@@ -0,0 +1,7 @@
+from pydantic import BaseModel
+from typing import Literal
+
+class CitySuggestion(BaseModel):
+    city: str
+    match: Literal["prefix", "word", "fuzzy"]
+    distance: int
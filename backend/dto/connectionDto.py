@@ -0,0 +1,20 @@
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import date, time
+
+class ConnectionLeg(BaseModel):
+    trip_id: int
+    route_id: int
+    start_city: str
+    end_city: str
+    travel_date: Optional[date]
+    day_offset: int   # days after the searched date that this leg departs
+    departure_time: time
+    arrival_time: time
+    price: int
+
+class Itinerary(BaseModel):
+    legs: List[ConnectionLeg]
+    duration_minutes: int
+    price: int
+    transfers: int
@@ -0,0 +1,14 @@
+from pydantic import BaseModel, Field
+from typing import Annotated, List
+from datetime import date, time
+
+class AddScheduleDetail(BaseModel):
+    bus_number: str
+    start_city: str
+    end_city: str
+    departure_time: time
+    arrival_time: time
+    price: int
+    days_of_week: List[Annotated[int, Field(ge=0, le=6)]] = Field(min_length=1)   # 0 = Monday ... 6 = Sunday
+    valid_from: date
+    valid_to: date
@@ -1,6 +1,16 @@
 from pydantic import BaseModel
+from typing import List, Literal, Union
 
 class SeatDetail(BaseModel):
     id: int
     bus_id: int
-    seat_label: str
\ No newline at end of file
+    seat_label: str
+
+class SeatMapDetail(BaseModel):
+    trip_id: int
+    bus_id: int
+    seat_ids: List[int]
+    seat_labels: List[str]
+    encoding: Literal["bitmap", "rle"]
+    occupancy: Union[str, List[int]]
+    booked: int
\ No newline at end of file
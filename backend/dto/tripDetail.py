@@ -1,6 +1,7 @@
 from pydantic import BaseModel
 from models.busType import BusAirType,BusSeatType
-from datetime import time
+from datetime import date,time
+from typing import Optional
 
 class GetTripDetails(BaseModel):
     id: int
@@ -13,6 +14,7 @@ class GetTripDetails(BaseModel):
     rating: int
     price: int
     seatsAvailable: int
+    travel_date: Optional[date] = None
 
 class AddBusTripDetail(BaseModel):
     bus_number: str
@@ -21,4 +23,4 @@ class AddBusTripDetail(BaseModel):
     departure_time: time
     arrival_time: time
     price: int
-    
\ No newline at end of file
+    travel_date: Optional[date] = None
@@ -15,4 +15,10 @@ class GetUser(BaseModel):
     name: str
     email: str
     role: UserRole
-    
\ No newline at end of file
+    
+
+class CurrentUser(BaseModel):
+    id: int
+    email: str
+    name: str
+    role: UserRole
\ No newline at end of file
@@ -1,17 +1,23 @@
 from fastapi import FastAPI,Depends
-from routers.authApi import router as authRouter , get_current_user
+from fastapi.responses import PlainTextResponse
+from routers.authApi import router as authRouter , get_current_user, known_users
 from routers.busRouter import router as busRouter
 from routers.routeRouter import router as routeRouter
 from routers.tripRouter import router as tripRouter
 from routers.bookingRouter import router as bookingRouter
 from routers.seatRouter import router as seatRouter
 from routers.tripSeatRouter import router as tripSeatRouter
-from database import create_db_and_tables
+from routers.scheduleRouter import router as scheduleRouter
+from routers.importRouter import router as importRouter
+from database import create_db_and_tables, close_async_engine
+from utils.tripSchedule import materialize_window
+from utils.cityIndex import city_index
+from utils.metrics import metrics, metrics_middleware, render_cache_stats
+from utils.refCache import cache_stats
+from utils.authUtil import verified_tokens
+from utils.queryWatchdog import watchdog_middleware
 from fastapi.middleware.cors import CORSMiddleware
-from sqlmodel import Session,select
-from database import getSession
-from models.Users import Users
-from dto.userDto import GetUser
+from dto.userDto import GetUser,CurrentUser
 
 app = FastAPI()
 
@@ -22,10 +28,18 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.middleware("http")(metrics_middleware)
+app.middleware("http")(watchdog_middleware)
 
 @app.on_event("startup")
 def on_startup():
     create_db_and_tables()
+    materialize_window()
+    city_index.warm()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await close_async_engine()
     
 app.include_router(authRouter)
 app.include_router(busRouter)
@@ -34,6 +48,8 @@ app.include_router(tripRouter)
 app.include_router(bookingRouter)
 app.include_router(seatRouter)
 app.include_router(tripSeatRouter)
+app.include_router(scheduleRouter)
+app.include_router(importRouter)
 
 student = [
     {
@@ -50,21 +66,27 @@ student = [
     }
 ]
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def getMetrics():
+    # Prometheus text exposition format
+    return PlainTextResponse(metrics.render() + render_cache_stats({
+        **cache_stats(), 'verified_tokens': verified_tokens.stats(), 'known_users': known_users.stats(),
+    }), media_type="text/plain; version=0.0.4")
+
 @app.get('/')
 def greeting():
     return "Hello World!!"
 
 @app.get('/Profile')
-def getProfile(email: str = Depends(get_current_user),session: Session = Depends(getSession)):
-    user: Users = session.exec(select(Users).where(Users.email == email)).first()
+def getProfile(user: CurrentUser = Depends(get_current_user)):
     return GetUser(name=user.name,email=user.email,role=user.role.value)
 
 @app.get("/student")
-def getStudent(email: str = Depends(get_current_user)):
+def getStudent(user: CurrentUser = Depends(get_current_user)):
     return student
 
 @app.post("/student")
-def addStudent(id: int,name : str , email: str=Depends(get_current_user)):
+def addStudent(id: int,name : str , user: CurrentUser=Depends(get_current_user)):
     student.append({
         'id' : id,
         'name' : name
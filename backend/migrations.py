@@ -0,0 +1,123 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, text
+from sqlmodel import SQLModel
+from utils.cityUtil import normalize_city
+
+# Versioned schema steps for databases created before a model change.
+# create_all only builds missing tables, so anything added to an existing table goes here.
+# Every step must also be a no-op on a fresh database that create_all has just built.
+
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(200), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+def create_indexes(*names):
+    # Indexes are declared on the models; a step just materializes the named ones if missing
+    def step(conn):
+        declared = {ix.name: ix for table in SQLModel.metadata.tables.values() for ix in table.indexes}
+        for name in names:
+            declared[name].create(conn, checkfirst=True)
+    return step
+
+def drop_index(table_name, name):
+    # For an index the models no longer declare; absent on a fresh database
+    def step(conn):
+        if name in {ix['name'] for ix in inspect(conn).get_indexes(table_name)}:
+            on = "" if conn.dialect.name == "sqlite" else f" ON {table_name}"
+            conn.execute(text(f"DROP INDEX {name}{on}"))
+    return step
+
+def merge_duplicate_routes(conn):
+    # Fill the normalized keys behind uq_routes_start_end_key. Routes whose names differ only in
+    # case or spacing share a key, which the index would reject: fold each into the lowest id and
+    # point its trips and schedules there. The names themselves are left as entered.
+    rows = conn.execute(text("select id, start_city, end_city from routes order by id")).all()
+    keep, keys = {}, []
+    for id, start_city, end_city in rows:
+        pair = (normalize_city(start_city), normalize_city(end_city))
+        if pair not in keep:
+            keep[pair] = id
+            keys.append({'s': pair[0], 'e': pair[1], 'id': id})
+            continue
+        for table in ("trips", "schedules"):
+            if inspect(conn).has_table(table):
+                conn.execute(text(f"update {table} set route_id = :keep where route_id = :id"), {'keep': keep[pair], 'id': id})
+        conn.execute(text("delete from routes where id = :id"), {'id': id})
+    if keys:
+        conn.execute(text("update routes set start_key = :s, end_key = :e where id = :id"), keys)
+
+def check_double_booked_seats(conn):
+    # Two tripseats for one seat are two passengers holding it; which booking wins is not ours to pick
+    duplicates = conn.execute(text(
+        "select trip_id, seat_id, count(*) from tripseats group by trip_id, seat_id having count(*) > 1"
+    )).all()
+    if duplicates:
+        listed = ", ".join(f"trip {t} seat {s} ({n}x)" for t, s, n in duplicates[:20])
+        raise RuntimeError(
+            f"Cannot add uq_tripseats_trip_seat: {len(duplicates)} seat(s) are booked more than once on the same trip: "
+            f"{listed}. Cancel the extra bookings, then restart."
+        )
+
+def add_columns(table_name, *names):
+    # New columns on an existing table, typed and defaulted from the model declaration
+    def step(conn):
+        table = SQLModel.metadata.tables[table_name]
+        existing = {c['name'] for c in inspect(conn).get_columns(table_name)}
+        for name in names:
+            if name not in existing:
+                column = table.c[name]
+                default = f" NOT NULL DEFAULT '{column.server_default.arg}'" if column.server_default is not None else ""
+                conn.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {name} {column.type.compile(dialect=conn.dialect)}{default}"))
+    return step
+
+def steps(*fns):
+    def step(conn):
+        for fn in fns:
+            fn(conn)
+    return step
+
+MIGRATIONS = [
+    # Its route half moved to 5, once the pair index went onto normalized keys
+    (1, "unique route city pair and seat per trip",
+        steps(check_double_booked_seats, create_indexes("uq_tripseats_trip_seat"))),
+    (2, "foreign key and router filter indexes",
+        create_indexes("ix_trips_route_id", "ix_trips_bus_id", "ix_seats_bus_id", "ix_bookings_trip_id", "ix_bookings_user_date")),
+    (3, "dated trip instances from recurring schedules",
+        steps(add_columns("trips", "travel_date", "schedule_id"),
+              create_indexes("ix_trips_route_date", "uq_trips_schedule_date"))),
+    (4, "trip version counter behind conditional GETs",
+        add_columns("trips", "version")),
+    (5, "normalized route keys under the unique city pair index",
+        steps(add_columns("routes", "start_key", "end_key"), drop_index("routes", "uq_routes_start_end"),
+              merge_duplicate_routes, create_indexes("uq_routes_start_end_key"))),
+]
+
+def applied_versions(engine) -> set:
+    with engine.begin() as conn:
+        schema_version.create(conn, checkfirst=True)
+        return {row.version for row in conn.execute(schema_version.select())}
+
+def run_migrations(engine) -> list:
+    done = applied_versions(engine)
+    applied = []
+    for version, name, step in MIGRATIONS:
+        if version in done:
+            continue
+        # One transaction per step so a failure leaves earlier versions recorded
+        with engine.begin() as conn:
+            step(conn)
+            conn.execute(schema_version.insert().values(version=version, name=name, applied_at=datetime.utcnow()))
+        applied.append((version, name))
+    return applied
+
+if __name__ == "__main__":
+    from database import engine, create_db_and_tables
+    before = applied_versions(engine) if inspect(engine).has_table("schema_version") else set()
+    create_db_and_tables()
+    for version, name, _ in MIGRATIONS:
+        state = "already applied" if version in before else "applied"
+        print(f"{version:>3} {name}: {state}")
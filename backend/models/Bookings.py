@@ -1,13 +1,17 @@
 from sqlmodel import SQLModel,Field,Relationship
+from sqlalchemy import Index
 from typing import Optional
 from models.bookingStatus import BookingStatus
 from datetime import datetime
 
 class Bookings(SQLModel, table=True):
+    # Booking history filters on user_id and pages on (date, id)
+    __table_args__ = (Index("ix_bookings_user_date", "user_id", "date", "id"),)
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     
     user_id: int = Field(foreign_key="users.id", nullable=False)
-    trip_id: int = Field(foreign_key="trips.id", nullable=False)
+    trip_id: int = Field(foreign_key="trips.id", nullable=False, index=True)
     trip_seat_id: int = Field(foreign_key="tripseats.id", nullable=False)
     seat_label: str = Field(max_length=100)
     
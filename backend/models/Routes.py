@@ -1,10 +1,17 @@
 from sqlmodel import SQLModel,Field,Relationship
+from sqlalchemy import Index
 from typing import Optional,List
 
 class Routes(SQLModel, table=True):
+    # Names are kept as entered; the keys hold their normalized form (utils.cityUtil), so a city pair
+    # lookup is a single index seek and "New Delhi" and "new  delhi" are one route
+    __table_args__ = (Index("uq_routes_start_end_key", "start_key", "end_key", unique=True),)
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     start_city: str = Field(max_length=100)
     end_city: str = Field(max_length=100)
+    start_key: str = Field(default="", max_length=100, sa_column_kwargs={'server_default': ""})
+    end_key: str = Field(default="", max_length=100, sa_column_kwargs={'server_default': ""})
     distance_km: int = Field(gt=0)
     
     trips: List["Trips"] = Relationship(back_populates="route" , cascade_delete=True) # type: ignore
\ No newline at end of file
@@ -0,0 +1,17 @@
+from sqlmodel import SQLModel,Field,Relationship
+from typing import Optional,List
+from datetime import date,time
+
+class Schedules(SQLModel, table=True):
+    # A recurring departure; dated Trips rows are materialized from it (utils.tripSchedule)
+    id: Optional[int] = Field(default=None, primary_key=True)
+    bus_id: int = Field(foreign_key="buses.id", nullable=False, index=True)
+    route_id: int = Field(foreign_key="routes.id", nullable=False, index=True)
+    departure_time: time
+    arrival_time: time
+    price: int
+    days_of_week: int = Field(ge=1, le=127)   # bitmask, Monday = 1 ... Sunday = 64
+    valid_from: date
+    valid_to: date
+    
+    trips: List["Trips"] = Relationship(back_populates="schedule") # type: ignore
@@ -3,7 +3,7 @@ from typing import Optional,List
 
 class Seats(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    bus_id: int = Field(foreign_key="buses.id", nullable=False)
+    bus_id: int = Field(foreign_key="buses.id", nullable=False, index=True)
     seat_label: str = Field(max_length=100)
     
     bus: Optional["Buses"] = Relationship(back_populates="seats") # type: ignore
@@ -1,7 +1,11 @@
 from sqlmodel import SQLModel,Field,Relationship
+from sqlalchemy import Index
 from typing import Optional
 
 class TripSeats(SQLModel, table=True):
+    # A seat can be held only once per trip; concurrent bookings race on this constraint
+    __table_args__ = (Index("uq_tripseats_trip_seat", "trip_id", "seat_id", unique=True),)
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     trip_id: int = Field(foreign_key="trips.id", nullable=False)
     seat_id: int = Field(foreign_key="seats.id", nullable=False)
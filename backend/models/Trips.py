@@ -1,17 +1,30 @@
 from sqlmodel import SQLModel,Field,Relationship
+from sqlalchemy import Index
 from typing import Optional,List
-from datetime import time
+from datetime import date,time
 
 class Trips(SQLModel, table=True):
+    # Search reads one route on one day; a schedule has at most one instance per day
+    __table_args__ = (
+        Index("ix_trips_route_date", "route_id", "travel_date"),
+        Index("uq_trips_schedule_date", "schedule_id", "travel_date", unique=True),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
-    bus_id: int = Field(foreign_key="buses.id", nullable=False)
-    route_id: int = Field(foreign_key="routes.id", nullable=False)
+    bus_id: int = Field(foreign_key="buses.id", nullable=False, index=True)
+    route_id: int = Field(foreign_key="routes.id", nullable=False, index=True)
     departure_time: time
     arrival_time: time
     price: int
     seatsAvailable: int
+    # Bumped with every seatsAvailable change; conditional GETs compare it instead of rebuilding the response
+    version: int = Field(default=0, sa_column_kwargs={'server_default': "0"})
+    # Null for trips created before dated instances; those are not tied to a day
+    travel_date: Optional[date] = None
+    schedule_id: Optional[int] = Field(default=None, foreign_key="schedules.id")
      
     bus: Optional["Buses"] = Relationship(back_populates="trips") # type: ignore
     route: Optional["Routes"] = Relationship(back_populates="trips") # type: ignore
+    schedule: Optional["Schedules"] = Relationship(back_populates="trips") # type: ignore
     bookings: List['Bookings'] = Relationship(back_populates='trip',cascade_delete=True) # type: ignore
     trip_seats: List["TripSeats"] = Relationship(back_populates="trip" , cascade_delete=True) # type: ignore
\ No newline at end of file
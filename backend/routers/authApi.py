@@ -1,61 +1,86 @@
 from fastapi import APIRouter,Depends,HTTPException,Response,Request
-from sqlmodel import Session,select
-from database import getSession
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import getAsyncSession
 from models.Users import Users
 from models.userRole import UserRole
 from models.RefreshToken import RefreshToken
-from dto.userDto import UserCreate,UserLogin
-from utils.authUtil import create_access_token,create_refresh_token,hash_password,verify_password,verify_token
+from dto.userDto import UserCreate,UserLogin,CurrentUser
+from utils.authUtil import create_access_token,create_refresh_token,hash_password_async,verify_password_async,hash_refresh_token,verify_refresh_token,verify_token,verify_token_cached
+from utils.cache import LRUCache
+import os
 
 router = APIRouter(tags=["Authetication"])
 
-def get_current_user(request: Request ):
+# Users seen recently, re-read from the DB at most once per TTL so deletes and role changes still land
+known_users = LRUCache(maxsize=int(os.getenv("USER_CACHE_SIZE", 10000)), ttl=int(os.getenv("USER_CACHE_TTL_SECONDS", 60)))
+
+def access_claims(user: Users) -> dict:
+    return {'sub' : user.email, 'uid' : user.id, 'name' : user.name, 'role' : user.role.value}
+
+def forget_user(user_id: int):
+    known_users.delete(user_id)
+
+async def get_current_user(request: Request, session: AsyncSession = Depends(getAsyncSession)) -> CurrentUser:
     token = request.cookies.get("access_token")
     if not token:
         raise HTTPException(status_code=401, detail="Access token missing")
     
-    return verify_token(token)
+    claims = verify_token_cached(token)
+    user: CurrentUser = known_users.get(claims.get('uid'))
+    
+    if user is None:
+        # Tokens issued before uid/role claims existed only carry the email
+        db_user = (await session.exec(
+            select(Users).where(Users.id == claims['uid']) if 'uid' in claims else select(Users).where(Users.email == claims['sub'])
+        )).first()
+        if not db_user:
+            raise HTTPException(status_code=401, detail="User no longer exists")
+        user = CurrentUser(id=db_user.id, email=db_user.email, name=db_user.name, role=db_user.role)
+        known_users.set(user.id, user)
+    
+    if 'uid' in claims and (claims['uid'] != user.id or claims.get('role') != user.role.value):
+        raise HTTPException(status_code=401, detail="Token is out of date, please log in again")
+    
+    return user
 
 @router.post("/register")
-def register(user: UserCreate,session: Session = Depends(getSession)):
-    existing_user = session.exec(select(Users).where(Users.email == user.email)).first()
+async def register(user: UserCreate,session: AsyncSession = Depends(getAsyncSession)):
+    existing_user = (await session.exec(select(Users).where(Users.email == user.email))).first()
     if existing_user :
         if(not existing_user.password):
-            existing_user.password = hash_password(user.password)
+            existing_user.password = await hash_password_async(user.password)
             session.add(existing_user)
-            session.commit()
-            session.refresh(existing_user)
+            await session.commit()
+            forget_user(existing_user.id)
             return {'message' : 'User registered success!!'}
         else:
             raise HTTPException(status_code=400, detail="Username already exists")
     role: UserRole  = UserRole.USER if user.role == 'user' else UserRole.ADMIN
-    dbUser = Users(name=user.name,email=user.email,password=hash_password(user.password),role=role)
+    dbUser = Users(name=user.name,email=user.email,password=await hash_password_async(user.password),role=role)
     session.add(dbUser)
-    session.commit()
-    session.refresh(dbUser)
+    await session.commit()
     return {'message' : 'User registered success!!'}
 
 @router.post("/login")
-def login(user: UserLogin , response: Response, session: Session = Depends(getSession)):
-    db_user = session.exec(select(Users).where(Users.email == user.email)).first()
-    if not db_user or not verify_password(user.password, db_user.password):
+async def login(user: UserLogin , response: Response, session: AsyncSession = Depends(getAsyncSession)):
+    db_user = (await session.exec(select(Users).where(Users.email == user.email))).first()
+    if not db_user or not await verify_password_async(user.password, db_user.password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
-    aToken = create_access_token({'sub' : db_user.email})
+    aToken = create_access_token(access_claims(db_user))
     rToken = create_refresh_token({'sub' : db_user.email})
     
-    existing_rToken = session.exec(select(RefreshToken).where(RefreshToken.email == user.email)).first()
+    existing_rToken = (await session.exec(select(RefreshToken).where(RefreshToken.email == user.email))).first()
     
     if existing_rToken:
-        existing_rToken.token = hash_password(rToken)
+        existing_rToken.token = hash_refresh_token(rToken)
         session.add(existing_rToken)
-        session.commit()
-        session.refresh(existing_rToken)
+        await session.commit()
     else:
-        newRToken = RefreshToken(email=user.email,token=hash_password(rToken))
+        newRToken = RefreshToken(email=user.email,token=hash_refresh_token(rToken))
         session.add(newRToken)
-        session.commit()
-        session.refresh(newRToken)
+        await session.commit()
         
     
     response.set_cookie(
@@ -80,7 +105,7 @@ def login(user: UserLogin , response: Response, session: Session = Depends(getSe
     return {"message" : "Login successful","data" : {'id' : db_user.id,'name' : db_user.name, 'email' : db_user.email}}
 
 @router.post("/refresh")
-def refresh(request: Request , response: Response,session: Session = Depends(getSession)):
+async def refresh(request: Request , response: Response,session: AsyncSession = Depends(getAsyncSession)):
     refresh_token = request.cookies.get("refresh_token")
     if refresh_token is None:
         raise HTTPException(
@@ -92,7 +117,7 @@ def refresh(request: Request , response: Response,session: Session = Depends(get
     
     email = verify_token(refresh_token)
     
-    existing_rToken = session.exec(select(RefreshToken).where(RefreshToken.email == email)).first()
+    existing_rToken = (await session.exec(select(RefreshToken).where(RefreshToken.email == email))).first()
     
     if existing_rToken is None:
         raise HTTPException(
@@ -100,16 +125,20 @@ def refresh(request: Request , response: Response,session: Session = Depends(get
             detail="Invalid or expired refresh token"
         )
         
-    if not verify_password(refresh_token,existing_rToken.token) :
+    if not verify_refresh_token(refresh_token,existing_rToken.token) :
         raise HTTPException(status_code=401, detail="Unauthorised Refresh token")
     
-    aToken = create_access_token({'sub' : email})
+    # Re-read the user so a new access token carries the current id and role
+    db_user = (await session.exec(select(Users).where(Users.email == email))).first()
+    if db_user is None:
+        raise HTTPException(status_code=401, detail="User no longer exists")
+    
+    aToken = create_access_token(access_claims(db_user))
     rToken = create_refresh_token({'sub' : email})
     
-    existing_rToken.token = hash_password(rToken)
+    existing_rToken.token = hash_refresh_token(rToken)
     session.add(existing_rToken)
-    session.commit()
-    session.refresh(existing_rToken)
+    await session.commit()
     
     response.set_cookie(
         key="access_token",
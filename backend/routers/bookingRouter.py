@@ -1,96 +1,135 @@
+from collections import Counter
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select, text
-from database import getSession
-from dto.busDto import GetBusDetail
-from dto.routeDto import GetRouteDetail
-from models.Trips import Trips
-from models.Bookings import Bookings
-from models.Users import Users
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import bindparam
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import getAsyncSession
 from models.bookingStatus import BookingStatus
 from dto.bookingDto import AddBookingDetail, CompleteBookingDetail
+from dto.userDto import CurrentUser
 from routers.authApi import get_current_user
-import routers.busRouter as bRouter
-import routers.routeRouter as rRouter
-from typing import List
+from utils.pagination import encode_cursor, decode_cursor
+from typing import List, Optional
 
 router = APIRouter(prefix="/booking", tags=['Booking'])
 
+async def takenSeats(session: AsyncSession, detail: List[AddBookingDetail]) -> List[str]:
+    # One IN lookup for the whole request, narrowed to the exact (trip, seat) pairs asked for
+    taken = (await session.execute(
+        text("""
+        SELECT trip_id, seat_id FROM tripseats
+        WHERE trip_id IN :tIds AND seat_id IN :sIds
+        """).bindparams(bindparam("tIds", expanding=True), bindparam("sIds", expanding=True)),
+        params={"tIds": list({d.trip_id for d in detail}), "sIds": list({d.seat_id for d in detail})}
+    )).all()
+    requested = {(d.trip_id, d.seat_id) for d in detail}
+    return [f"seat {s} on trip {t}" for t, s in taken if (t, s) in requested]
+
 @router.post("/add")
-def addBooking(
+async def addBooking(
     detail: List[AddBookingDetail],
-    session: Session = Depends(getSession),
-    email: str = Depends(get_current_user)
+    session: AsyncSession = Depends(getAsyncSession),
+    user: CurrentUser = Depends(get_current_user)
 ):
     try:
-        # This is fine because it is a SQLModel select
-        user = session.exec(
-            select(Users).where(Users.email == email)
-        ).first()
-
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-
-        for d in detail:
-            # 1. Check if already booked
-            # Use session.execute() for raw SQL with parameters
-            seat_exists = session.execute(
-                text("""
-                SELECT id FROM tripseats 
-                WHERE seat_id = :s AND trip_id = :t
-                """),
-                params={"s": d.seat_id, "t": d.trip_id}
-            ).first()
-
-            if seat_exists:
-                raise HTTPException(
-                    status_code=400,
-                    detail=f"Seat {d.seat_id} is already booked for trip {d.trip_id}"
-                )
-
-            # 2. Insert TripSeat and RETURN ID
-            # Use session.execute()
-            trip_seat_id = session.execute(
-                text("""
-                INSERT INTO tripseats(seat_id, trip_id)
-                VALUES (:s, :t)
-                RETURNING id
-                """),
-                params={"s": d.seat_id, "t": d.trip_id}
-            ).one()[0]
-            # Get seat label for booking record
-            sl = session.exec(
-                text("select seat_label from seats where id = :sId"),
-                params={"sId": d.seat_id}
-            ).first().seat_label
-
-            # 3. Insert booking
-            # Use session.execute()
-            session.execute(
+        if not detail:
+            raise HTTPException(status_code=400, detail="No seats to book")
+
+        if len({(d.trip_id, d.seat_id) for d in detail}) != len(detail):
+            raise HTTPException(status_code=400, detail="The same seat is listed more than once")
+
+        # The whole list is handled as a set: a fixed number of statements however many seats are booked
+        # 1. Check if any seat is already booked
+        contested = await takenSeats(session, detail)
+        if contested:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"Seats already booked: {', '.join(contested)}"
+            )
+
+        # 2. Get seat labels for the booking records
+        labels = dict((await session.execute(
+            text("SELECT id, seat_label FROM seats WHERE id IN :sIds").bindparams(bindparam("sIds", expanding=True)),
+            params={"sIds": list({d.seat_id for d in detail})}
+        )).all())
+
+        missing = sorted({d.seat_id for d in detail} - labels.keys())
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Seats {missing} not found")
+
+        # 3. Insert TripSeats in bulk
+        # The unique (trip_id, seat_id) constraint still rejects a seat taken since the check above
+        await session.execute(
+            text("INSERT INTO tripseats(seat_id, trip_id) VALUES (:s, :t)"),
+            [{"s": d.seat_id, "t": d.trip_id} for d in detail]
+        )
+
+        tripSeatIds = {
+            (t, s): tsId for tsId, t, s in (await session.execute(
                 text("""
-                INSERT INTO bookings(user_id, trip_id, trip_seat_id,seat_label, price, date, booking_status)
-                VALUES (:u, :t, :ts,:sl, :p, :d, :bs)
-                """),
-                params={
+                SELECT id, trip_id, seat_id FROM tripseats
+                WHERE trip_id IN :tIds AND seat_id IN :sIds
+                """).bindparams(bindparam("tIds", expanding=True), bindparam("sIds", expanding=True)),
+                params={"tIds": list({d.trip_id for d in detail}), "sIds": list({d.seat_id for d in detail})}
+            )).all()
+        }
+
+        # 4. Take the seats off each trip's counter in the same transaction
+        perTrip = Counter(d.trip_id for d in detail)
+        counter = await session.execute(
+            text("""
+            UPDATE trips SET seatsAvailable = seatsAvailable - :n, version = version + 1
+            WHERE id = :t AND seatsAvailable >= :n
+            """),
+            [{"t": t, "n": n} for t, n in perTrip.items()]
+        )
+
+        if counter.rowcount != len(perTrip):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Not enough seats available for trips {sorted(perTrip)}"
+            )
+
+        # 5. Insert bookings in bulk
+        now = datetime.now()
+        await session.execute(
+            text("""
+            INSERT INTO bookings(user_id, trip_id, trip_seat_id,seat_label, price, date, booking_status)
+            VALUES (:u, :t, :ts,:sl, :p, :d, :bs)
+            """),
+            [
+                {
                     "u": user.id,
                     "t": d.trip_id,
-                    "ts": trip_seat_id,
-                    "sl": sl,
+                    "ts": tripSeatIds[(d.trip_id, d.seat_id)],
+                    "sl": labels[d.seat_id],
                     "p": d.price,
-                    "d": datetime.now(),
+                    "d": now,
                     "bs": BookingStatus.UPCOMING.value
                 }
-            )
+                for d in detail
+            ]
+        )
 
         # Commit ONCE (atomic)
-        session.commit()
+        await session.commit()
 
         return {"message": "Booking data added", "data": detail}
 
     except HTTPException:
         raise
+    except IntegrityError:
+        await session.rollback()
+        # Lost a race with a concurrent booking; report every seat that is now held
+        contested = await takenSeats(session, detail)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Seats already booked: {', '.join(contested)}" if contested else "Seat or trip does not exist"
+        )
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         # It's good practice to log the error here
         print(f"Error: {e}") 
         raise HTTPException(
@@ -101,53 +140,55 @@ def addBooking(
 
 
 @router.get('/get')
-def getBooking(email:str = Depends(get_current_user),session: Session = Depends(getSession)):
+async def getBooking(
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    booking_status: Optional[BookingStatus] = Query(None, alias="status"),
+    user: CurrentUser = Depends(get_current_user),
+    session: AsyncSession = Depends(getAsyncSession)
+):
     try:
+        filters = ["b.user_id = :uId"]
+        params = {'uId': user.id, 'lim': limit + 1}
         
-        user = session.exec(
-            select(Users).where(Users.email == email)
-        ).first()
-
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
+        if booking_status:
+            filters.append("b.booking_status = :bs")
+            params['bs'] = booking_status.value
         
-        data: List[Bookings] = session.exec(
-            text("select * from bookings where user_id=:uId"),
-            params={'uId': user.id}
-            ).all()
+        # Keyset on (date, id): resume strictly after the last row of the previous page
+        if cursor:
+            try:
+                cDate, cId = decode_cursor(cursor)
+                params['cDate'] = datetime.fromisoformat(cDate)
+                params['cId'] = int(cId)
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            filters.append("(b.date < :cDate or (b.date = :cDate and b.id < :cId))")
         
-        bookingDetail: List[CompleteBookingDetail] = []
+        data = (await session.exec(
+            text(f"""
+            select b.id, b.booking_status, bu.operator, bu.air_type, bu.seat_type, b.seat_label,
+                   r.start_city, r.end_city, b.date, t.departure_time, t.arrival_time, t.travel_date, b.price
+            from bookings b
+            join trips t on t.id = b.trip_id
+            join buses bu on bu.id = t.bus_id
+            join routes r on r.id = t.route_id
+            where {" and ".join(filters)}
+            order by b.date desc, b.id desc
+            limit :lim
+            """),
+            params=params
+        )).all()
         
-        for d in data:
-            trip: Trips = session.exec(text("select * from trips where id=:tId"), params={'tId': d.trip_id}).first()
-            
-            if not trip:
-                continue # Skip if trip data is missing
-            
-            bus_response = bRouter.getBusById(trip.bus_id, session)
-            bus: GetBusDetail = bus_response['data']
-            
-            route_response = rRouter.getRouteById(trip.route_id, session)
-            route: GetRouteDetail = route_response['data']
-            
-            cBDetail = CompleteBookingDetail(
-                id=d.id,
-                booking_status=d.booking_status,
-                operator=bus.operator,
-                air_type=bus.air_type,
-                seat_type=bus.seat_type,
-                start_city=route.start_city,
-                end_city=route.end_city,
-                date=d.date,
-                departure_time=trip.departure_time,
-                arrival_time=trip.arrival_time,
-                price=d.price,
-                seat_label=d.seat_label
-            )
-            
-            bookingDetail.append(cBDetail)
+        bookingDetail: List[CompleteBookingDetail] = [CompleteBookingDetail(**d._mapping) for d in data[:limit]]
+        
+        # One extra row was fetched to know whether another page exists
+        next_cursor = None
+        if len(data) > limit:
+            last = bookingDetail[-1]
+            next_cursor = encode_cursor(last.date, last.id)
             
-        return {"message": "Booking data fetched", 'data': bookingDetail}
+        return {"message": "Booking data fetched", 'data': bookingDetail, 'next_cursor': next_cursor}
 
     except HTTPException as he:
         raise he
@@ -155,9 +196,9 @@ def getBooking(email:str = Depends(get_current_user),session: Session = Depends(
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
     
 @router.post("/cancel/{bId}")
-def cancelBook(bId: int, session: Session = Depends(getSession),email: str = Depends(get_current_user)):
+async def cancelBook(bId: int, session: AsyncSession = Depends(getAsyncSession),user: CurrentUser = Depends(get_current_user)):
     # Execute the raw update query
-    result = session.exec(
+    result = await session.exec(
         text("UPDATE bookings SET booking_status = :status WHERE id = :bId"),
         params={
             "status": BookingStatus.CANCELLED.value, # Fixed typo: CACELLED -> CANCELLED
@@ -165,12 +206,19 @@ def cancelBook(bId: int, session: Session = Depends(getSession),email: str = Dep
         }
     )
     
-    session.exec(
+    freed = await session.exec(
         text("delete from tripseats where id = (select trip_seat_id from bookings where id = :bId)"),
         params={"bId": bId}
     )
     
-    session.commit()
+    # Give the seat back only if it was actually released, so repeat cancels don't inflate the counter
+    if freed.rowcount > 0:
+        await session.exec(
+            text("update trips set seatsAvailable = seatsAvailable + 1, version = version + 1 where id = (select trip_id from bookings where id = :bId)"),
+            params={"bId": bId}
+        )
+    
+    await session.commit()
 
     # Check if the database actually found and updated a row
     if result.rowcount == 0:
@@ -1,33 +1,44 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, text
-from database import getSession
+from sqlmodel import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import getAsyncSession
 from models.Buses import Buses
 from dto.busDto import GetBusDetail, AddBusDetail
-import random
+from utils.seatLayout import generate_seat_labels
+from utils.refCache import bus_cache
+from utils.versionStamp import bus_versions
 
 router = APIRouter(prefix="/buses", tags=['Buses'])
 
 @router.get('/{busId}')
-def getBusById(busId: int, session: Session = Depends(getSession)):
+async def getBusById(busId: int, session: AsyncSession = Depends(getAsyncSession)):
     try:
-        result = session.exec(text("select * from buses where id = :bId"), params={"bId": busId})
+        busDetail: GetBusDetail = bus_cache.get(('id', busId))
+        if busDetail:
+            return {"message": "bus fetched", "data": busDetail}
+
+        result = await session.exec(text("select * from buses where id = :bId"), params={"bId": busId})
         bus: Buses = result.first()
 
         # Check if bus exists before accessing attributes
         if not bus:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Bus with ID {busId} not found")
 
+        busDetail = GetBusDetail(
+            id=bus.id,
+            operator=bus.operator,
+            bus_number=bus.bus_number,
+            air_type=bus.air_type,
+            seat_type=bus.seat_type,
+            total_seat=bus.total_seat,
+            rating=bus.rating
+        )
+        bus_cache.set(('id', bus.id), busDetail)
+        bus_cache.set(('number', bus.bus_number), busDetail)
+
         return {
             "message": "bus fetched",
-            "data": GetBusDetail(
-                id=bus.id,
-                operator=bus.operator,
-                bus_number=bus.bus_number,
-                air_type=bus.air_type,
-                seat_type=bus.seat_type,
-                total_seat=bus.total_seat,
-                rating=bus.rating
-            )
+            "data": busDetail
         }
     except HTTPException as he:
         raise he
@@ -36,26 +47,34 @@ def getBusById(busId: int, session: Session = Depends(getSession)):
 
 
 @router.get('/number/{busNumber}') 
-def getBusByNumber(busNumber: str, session: Session = Depends(getSession)):
+async def getBusByNumber(busNumber: str, session: AsyncSession = Depends(getAsyncSession)):
     try:
-        result = session.exec(text("select * from buses where bus_number = :bNumber"), params={"bNumber": busNumber})
+        busDetail: GetBusDetail = bus_cache.get(('number', busNumber))
+        if busDetail:
+            return {"message": "bus fetched", "data": busDetail}
+
+        result = await session.exec(text("select * from buses where bus_number = :bNumber"), params={"bNumber": busNumber})
         bus: Buses = result.first()
 
         # Check if bus exists
         if not bus:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Bus number {busNumber} not found")
 
+        busDetail = GetBusDetail(
+            id=bus.id,
+            operator=bus.operator,
+            bus_number=bus.bus_number,
+            air_type=bus.air_type,
+            seat_type=bus.seat_type,
+            total_seat=bus.total_seat,
+            rating=bus.rating
+        )
+        bus_cache.set(('id', bus.id), busDetail)
+        bus_cache.set(('number', bus.bus_number), busDetail)
+
         return {
             "message": "bus fetched",
-            "data": GetBusDetail(
-                id=bus.id,
-                operator=bus.operator,
-                bus_number=bus.bus_number,
-                air_type=bus.air_type,
-                seat_type=bus.seat_type,
-                total_seat=bus.total_seat,
-                rating=bus.rating
-            )
+            "data": busDetail
         }
     except HTTPException as he:
         raise he
@@ -64,9 +83,15 @@ def getBusByNumber(busNumber: str, session: Session = Depends(getSession)):
 
 
 @router.post('/add')
-def addBus(busDeatil: AddBusDetail, session: Session = Depends(getSession)):
+async def addBus(busDeatil: AddBusDetail, session: AsyncSession = Depends(getAsyncSession)):
+    try:
+        seat_labels = generate_seat_labels(busDeatil.total_seat, busDeatil.seat_type, busDeatil.seat_columns)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
     try:
-        session.exec(
+        # Bus row and its whole seat layout go in together in one transaction
+        result = await session.exec(
             text("insert into buses(operator,bus_number,air_type,seat_type,total_seat,rating) values(:e1,:e2,:e3,:e4,:e5,:e6)"),
             params={
                 'e1': busDeatil.operator,
@@ -77,47 +102,19 @@ def addBus(busDeatil: AddBusDetail, session: Session = Depends(getSession)):
                 'e6': busDeatil.rating
             }
         )
-        session.commit()
+        bus_id = result.lastrowid
     
-        count = busDeatil.total_seat
-        i=1
-        while(count > 0):
-            rand = random.randint(1, 2)
-            if count == 1 or rand == 1 :
-                seat_label = f"{i}A"
-                i+=1
-                count-=1
-                session.exec(
-                    text("insert into seats(seat_label,bus_id) values(:sLabel,(select id from buses where bus_number=:bNumber))"),
-                    params={
-                        'sLabel': seat_label,
-                        'bNumber': busDeatil.bus_number
-                    }
-                )
-            else:
-                seat_label1 = f"{i}A"
-                seat_label2 = f"{i}B"
-                i+=1
-                count-=2
-                session.exec(
-                    text("insert into seats(seat_label,bus_id) values(:sLabel1,(select id from buses where bus_number=:bNumber))"),
-                    params={
-                        'sLabel1': seat_label1,
-                        'bNumber': busDeatil.bus_number
-                    }
-                )
-                session.exec(
-                    text("insert into seats(seat_label,bus_id) values(:sLabel2,(select id from buses where bus_number=:bNumber))"),
-                    params={
-                        'sLabel2': seat_label2,
-                        'bNumber': busDeatil.bus_number
-                    }
-                )
-        session.commit()
+        await session.exec(
+            text("insert into seats(seat_label,bus_id) values(:sLabel,:bId)"),
+            params=[{'sLabel': label, 'bId': bus_id} for label in seat_labels]
+        )
+        await session.commit()
+        bus_cache.invalidate(('id', bus_id))
+        bus_cache.invalidate(('number', busDeatil.bus_number))
+        bus_versions.bump(bus_id)
     
         return {"message": "bus data added", 'data': busDeatil}
     except Exception as e:
         # Important: Rollback the session if an error occurs (e.g., duplicate entry)
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to add bus: {str(e)}")
-    
\ No newline at end of file
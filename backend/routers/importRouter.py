@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import getAsyncSession
+from dto.userDto import CurrentUser
+from models.userRole import UserRole
+from routers.authApi import get_current_user
+from utils.bulkImport import IMPORTERS, IMPORT_BATCH_SIZE, RecordParser
+from typing import Literal, Optional
+import codecs
+
+router = APIRouter(prefix="/import", tags=['Import'])
+
+async def request_lines(request: Request):
+    # The body is read as it arrives; a line cut between two chunks waits for the rest
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    partial = ""
+    async for chunk in request.stream():
+        lines = (partial + decoder.decode(chunk)).splitlines(keepends=True)
+        partial = lines.pop() if lines and not lines[-1].endswith(("\n", "\r")) else ""
+        for line in lines:
+            yield line
+    partial += decoder.decode(b"", final=True)
+    if partial:
+        yield partial
+
+@router.post('/{kind}')
+async def bulkImport(
+    kind: Literal['buses', 'routes', 'trips'],
+    request: Request,
+    format: Optional[Literal['csv', 'ndjson']] = Query(None, description="default from the Content-Type, ndjson otherwise"),
+    batch: int = Query(IMPORT_BATCH_SIZE, ge=1, le=10000),
+    session: AsyncSession = Depends(getAsyncSession),
+    user: CurrentUser = Depends(get_current_user)
+):
+    if user.role != UserRole.ADMIN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Only admins can import data")
+
+    fmt = format or ("csv" if "csv" in request.headers.get("content-type", "") else "ndjson")
+    importer, parser = IMPORTERS[kind](), RecordParser(fmt)
+    try:
+        chunk = []
+        async for line in request_lines(request):
+            chunk.append(line)
+            if len(chunk) >= batch:
+                records = parser.feed(chunk)
+                await session.run_sync(lambda s: importer.write(s, records))
+                chunk = []
+        records = parser.feed(chunk) + parser.finish()
+        await session.run_sync(lambda s: importer.write(s, records))
+        return {"message": f"{kind} import finished", 'data': importer.report()}
+
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Input must be UTF-8")
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Import stopped after {importer.imported} rows: {str(e)}")
+    finally:
+        # Batches already committed stay, so caches are told about them even when a later one failed
+        importer.finish()
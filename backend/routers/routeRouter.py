@@ -1,28 +1,103 @@
-from fastapi import APIRouter,Depends,HTTPException,Response,Request,status
-from sqlmodel import Session,text
-from database import getSession
+from fastapi import APIRouter,Depends,HTTPException,Query,Response,Request,status
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import getAsyncSession
 from models.Routes import Routes
 from dto.routeDto import GetRouteDetail,AddRouteDetail
+from dto.connectionDto import Itinerary
+from dto.cityDto import CitySuggestion
+from utils.refCache import route_cache
+from utils.cityUtil import normalize_city
+from utils.connectionGraph import connection_graph
+from utils.cityIndex import city_index
+from datetime import date, time
+from typing import List, Literal, Optional
 
 router = APIRouter(prefix="/routes",tags=['Routes'])
 
+@router.get("/cities/suggest")
+async def suggestCities(
+    q: str,
+    limit: int = Query(10, ge=1, le=50),
+    fuzzy: bool = True,
+    session: AsyncSession = Depends(getAsyncSession)
+):
+    try:
+        # Served from the in-memory index; the session is only used if another worker asked for a reload
+        await city_index.ensure_loaded(session)
+        suggestions: List[CitySuggestion] = [CitySuggestion(**c) for c in city_index.suggest(q, limit, fuzzy)]
+        return {"message": "cities suggested", "data": suggestions}
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+# Declared ahead of /{routeId} so "connections" is not parsed as a route id
+@router.get("/connections")
+async def getConnections(
+    start_city: str,
+    end_city: str,
+    travel_date: Optional[date] = None,
+    depart_after: Optional[time] = None,
+    min_layover: int = Query(30, ge=0, description="minutes"),
+    max_layover: int = Query(720, ge=0, description="minutes"),
+    max_legs: int = Query(3, ge=1, le=4),
+    k: int = Query(5, ge=1, le=20),
+    sort: Literal["duration", "price"] = "duration",
+    session: AsyncSession = Depends(getAsyncSession)
+):
+    try:
+        if max_layover < min_layover:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="max_layover is below min_layover")
+
+        # Only trips added since the last search are read; the search itself runs in memory
+        await connection_graph.refresh(session)
+        itineraries: List[Itinerary] = [
+            Itinerary(**it) for it in connection_graph.search(
+                normalize_city(start_city),
+                normalize_city(end_city),
+                travel_date=travel_date,
+                depart_after=depart_after.hour * 60 + depart_after.minute if depart_after else 0,
+                min_layover=min_layover,
+                max_layover=max_layover,
+                max_legs=max_legs,
+                k=k,
+                sort=sort,
+            )
+        ]
+
+        if not itineraries:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No connection found between these cities")
+
+        return {"message": "connections fetched", "data": itineraries}
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
 @router.get("/{routeId}")
-def getRouteById(routeId: int, session: Session = Depends(getSession)):
+async def getRouteById(routeId: int, session: AsyncSession = Depends(getAsyncSession)):
     try:
-        result = session.exec(text("select * from routes where id = :rId"), params={"rId": routeId})
+        routeDetail: GetRouteDetail = route_cache.get(('id', routeId))
+        if routeDetail:
+            return {"message": "route fetched", "data": routeDetail}
+
+        result = await session.exec(text("select * from routes where id = :rId"), params={"rId": routeId})
         route: Routes = result.first()
         
         if not route:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Route with ID {routeId} not found")
 
+        routeDetail = GetRouteDetail(
+            id=route.id,
+            start_city=route.start_city,
+            end_city=route.end_city,
+            distance_km=route.distance_km
+        )
+        route_cache.set(('id', route.id), routeDetail)
+
         return {
             "message": "route fetched",
-            "data": GetRouteDetail(
-                id=route.id,
-                start_city=route.start_city,
-                end_city=route.end_city,
-                distance_km=route.distance_km
-            )
+            "data": routeDetail
         }
     except HTTPException as he:
         raise he
@@ -30,22 +105,31 @@ def getRouteById(routeId: int, session: Session = Depends(getSession)):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
     
 @router.get("/")
-def getRouteBySE(start_city: str,end_city: str, session: Session = Depends(getSession)):
+async def getRouteBySE(start_city: str,end_city: str, session: AsyncSession = Depends(getAsyncSession)):
     try:
-        result = session.exec(text("select * from route_details_view where start_city = :sCity and end_city = :eCity"), params={"sCity": start_city.lower(),"eCity": end_city.lower()})
+        cacheKey = ('se', normalize_city(start_city), normalize_city(end_city))
+        routeDetail: GetRouteDetail = route_cache.get(cacheKey)
+        if routeDetail:
+            return {"message": "route fetched", "data": routeDetail}
+
+        result = await session.exec(text("select * from routes where start_key = :sKey and end_key = :eKey"), params={"sKey": cacheKey[1],"eKey": cacheKey[2]})
         route: Routes = result.first()
         
         if not route:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Route with this destination is not found")
 
+        routeDetail = GetRouteDetail(
+            id=route.id,
+            start_city=route.start_city,
+            end_city=route.end_city,
+            distance_km=route.distance_km
+        )
+        route_cache.set(cacheKey, routeDetail)
+        route_cache.set(('id', route.id), routeDetail)
+
         return {
             "message": "route fetched",
-            "data": GetRouteDetail(
-                id=route.id,
-                start_city=route.start_city,
-                end_city=route.end_city,
-                distance_km=route.distance_km
-            )
+            "data": routeDetail
         }
     except HTTPException as he:
         raise he
@@ -53,20 +137,27 @@ def getRouteBySE(start_city: str,end_city: str, session: Session = Depends(getSe
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
     
 @router.post('/add')
-def addRoute(routeDeatil: AddRouteDetail, session: Session = Depends(getSession)):
+async def addRoute(routeDeatil: AddRouteDetail, session: AsyncSession = Depends(getAsyncSession)):
     try:
-        session.exec(
-            text("insert into routes(start_city,end_city,distance_km) values(:e1,:e2,:e3)"),
+        await session.exec(
+            text("insert into routes(start_city,end_city,start_key,end_key,distance_km) values(:e1,:e2,:e3,:e4,:e5)"),
             params={
-                'e1': routeDeatil.start_city.lower(),
-                'e2': routeDeatil.end_city.lower(),
-                'e3': routeDeatil.distance_km,
+                'e1': routeDeatil.start_city,
+                'e2': routeDeatil.end_city,
+                'e3': normalize_city(routeDeatil.start_city),
+                'e4': normalize_city(routeDeatil.end_city),
+                'e5': routeDeatil.distance_km,
             }
         )
-        session.commit()
+        await session.commit()
+        route_cache.invalidate(('se', normalize_city(routeDeatil.start_city), normalize_city(routeDeatil.end_city)))
+        city_index.add_cities(routeDeatil.start_city, routeDeatil.end_city)
         return {"message": "route data added", 'data': routeDeatil}
     
+    except IntegrityError:
+        await session.rollback()
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Route with this destination already exists")
     except Exception as e:
         # Important: Rollback the session if an error occurs (e.g., duplicate entry)
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to add route: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlmodel import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import getAsyncSession
+from dto.scheduleDto import AddScheduleDetail
+from utils.tripSchedule import materialize_trips, days_mask, TRIP_WINDOW_DAYS
+from utils.connectionGraph import connection_graph
+import routers.busRouter as bRouter
+import routers.routeRouter as rRouter
+from datetime import date
+from typing import Optional
+
+router = APIRouter(prefix="/schedules", tags=['Schedules'])
+
+@router.post('/add')
+async def addSchedule(detail: AddScheduleDetail, session: AsyncSession = Depends(getAsyncSession)):
+    if detail.valid_to < detail.valid_from:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="valid_to is before valid_from")
+
+    try:
+        bus_response = await bRouter.getBusByNumber(detail.bus_number, session)
+        route_response = await rRouter.getRouteBySE(detail.start_city, detail.end_city, session)
+        route_id = route_response['data'].id
+
+        result = await session.exec(
+            text("""
+            insert into schedules(bus_id,route_id,departure_time,arrival_time,price,days_of_week,valid_from,valid_to)
+            values(:e1,:e2,:e3,:e4,:e5,:e6,:e7,:e8)
+            """),
+            params={
+                'e1': bus_response['data'].id,
+                'e2': route_id,
+                'e3': str(detail.departure_time),
+                'e4': str(detail.arrival_time),
+                'e5': detail.price,
+                'e6': days_mask(detail.days_of_week),
+                'e7': str(detail.valid_from),
+                'e8': str(detail.valid_to)
+            }
+        )
+        schedule_id = result.lastrowid
+        await session.commit()
+
+        # Fill the current window right away so the new departures are searchable
+        created = await session.run_sync(lambda s: materialize_trips(s, date.today(), TRIP_WINDOW_DAYS, schedule_id))
+        if created:
+            connection_graph.invalidate()
+
+        return {"message": "schedule added", 'data': {'id': schedule_id, 'trips_created': created}}
+
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to add schedule: {str(e)}")
+
+@router.post('/materialize')
+async def materializeSchedules(
+    start: Optional[date] = None,
+    days: int = Query(TRIP_WINDOW_DAYS, ge=1, le=366),
+    session: AsyncSession = Depends(getAsyncSession)
+):
+    try:
+        created = await session.run_sync(lambda s: materialize_trips(s, start or date.today(), days))
+        if created:
+            connection_graph.invalidate()
+        return {"message": "trips materialized", 'data': {'trips_created': created}}
+    except Exception as e:
+        await session.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to materialize trips: {str(e)}")
@@ -1,21 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, text
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlmodel import text
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
-from database import getSession
+from database import getAsyncSession
 from dto.seatDto import SeatDetail
 from models.Seats import Seats
+from utils.versionStamp import bus_versions, make_etag, etag_headers, not_modified
 
 router = APIRouter(prefix="/seat",tags=['Seats'])
 
 @router.get("/{busId}")
-def getSeatsByBusId(busId: int, session: Session = Depends(getSession)):
+async def getSeatsByBusId(busId: int, request: Request, response: Response, session: AsyncSession = Depends(getAsyncSession)):
     try:
-        result = session.exec(text("select * from seats where bus_id = :bId"), params={"bId": busId})
+        etag = make_etag("seats", busId, bus_versions.current(busId))
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        
+        result = await session.exec(text("select * from seats where bus_id = :bId"), params={"bId": busId})
         seats: List[Seats] = result.all()
         
         if not seats:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Seats for Bus ID {busId} not found")
         
+        response.headers.update(etag_headers(etag))
         sd: List[SeatDetail] = [SeatDetail(id=s.id,bus_id=s.bus_id,seat_label=s.seat_label) for s in seats]
         
         return {
@@ -1,33 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, text
-from database import getSession
-from dto.tripSeatDto import TripSeatDetail
-from models.Trips import Trips
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy import bindparam
+from sqlmodel import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from database import getAsyncSession
 from dto.tripDetail import GetTripDetails, AddBusTripDetail
+from dto.seatDto import SeatMapDetail
+from models.busType import BusAirType, BusSeatType
+from utils.occupancy import encode_bitmap, encode_rle
+from utils.pagination import encode_cursor, decode_cursor
+from utils.connectionGraph import connection_graph
+from utils.versionStamp import make_etag, etag_headers, not_modified
 import routers.busRouter as bRouter
-import routers.tripSeatRouter as tsRouter
 import routers.routeRouter as rRouter
-from typing import List
+from datetime import date, time
+from typing import List, Literal, Optional
 
 router = APIRouter(prefix="/trips", tags=['Trips'])
 
 @router.post("/")
-def addBusTripDetail(detail: AddBusTripDetail, session: Session = Depends(getSession)):
+async def addBusTripDetail(detail: AddBusTripDetail, session: AsyncSession = Depends(getAsyncSession)):
     try:
         
-        bus_response = bRouter.getBusByNumber(detail.bus_number, session)
+        bus_response = await bRouter.getBusByNumber(detail.bus_number, session)
         bus_id = bus_response['data'].id
         
         # 4. Retrieve Route
-        route_response = rRouter.getRouteBySE(detail.start_city, detail.end_city, session)
+        route_response = await rRouter.getRouteBySE(detail.start_city, detail.end_city, session)
         route_id = route_response['data'].id
 
         # 5. Calculate Available Seats
         seats_available = bus_response['data'].total_seat
 
         # 6. Insert Trip - FIX APPLIED HERE
-        session.exec(
-            text("insert into trips(bus_id,route_id,departure_time,arrival_time,price,seatsAvailable) values(:e1,:e2,:e3,:e4,:e5,:e6)"),
+        await session.exec(
+            text("insert into trips(bus_id,route_id,departure_time,arrival_time,price,seatsAvailable,travel_date) values(:e1,:e2,:e3,:e4,:e5,:e6,:e7)"),
             params={
                 'e1': bus_id,
                 'e2': route_id,
@@ -35,69 +41,201 @@ def addBusTripDetail(detail: AddBusTripDetail, session: Session = Depends(getSes
                 'e3': str(detail.departure_time), 
                 'e4': str(detail.arrival_time),
                 'e5': detail.price,
-                'e6': seats_available
+                'e6': seats_available,
+                'e7': str(detail.travel_date) if detail.travel_date else None
             }
         )
-        session.commit()
+        await session.commit()
+        connection_graph.invalidate()
         return {"message": "trip data added", 'data': detail}
 
     except HTTPException as he:
         raise he
     except Exception as e:
-        session.rollback()
+        await session.rollback()
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to add trip: {str(e)}")
     
+# Sort options: (key column, descending); ties always break on trip id so the keyset is total
+TRIP_SORTS = {
+    'recommended': (None, False),
+    'price_low': ("t.price", False),
+    'price_high': ("t.price", True),
+    'departure': ("t.departure_time", False),
+    'rating': ("b.rating", True),
+}
+
 @router.get("/get")
-def getBusTripDetails(start_city: str, end_city: str, session: Session = Depends(getSession)):
+async def getBusTripDetails(
+    start_city: str,
+    end_city: str,
+    request: Request,
+    response: Response,
+    travel_date: Optional[date] = None,
+    air_type: Optional[List[BusAirType]] = Query(None),
+    seat_type: Optional[List[BusSeatType]] = Query(None),
+    depart_after: Optional[time] = None,
+    depart_before: Optional[time] = None,
+    min_price: Optional[int] = Query(None, ge=0),
+    max_price: Optional[int] = Query(None, ge=0),
+    min_seats: Optional[int] = Query(None, ge=1),
+    sort: Literal["recommended", "price_low", "price_high", "departure", "rating"] = "recommended",
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    session: AsyncSession = Depends(getAsyncSession)
+):
     try:
-        busTripDetails: List[GetTripDetails] = [] # Fixed type hint
-        
         # 1. Get Route ID
-        route_response = rRouter.getRouteBySE(start_city, end_city, session)
+        route_response = await rRouter.getRouteBySE(start_city, end_city, session)
         route_id = route_response['data'].id
         
-        # 2. Get Trips for this Route
-        data = session.exec(text("select * from trips where route_id=:rId"), params={'rId': route_id})
-        trips: List[Trips] = data.all()
+        # 2. Build the filters; everything is narrowed, ordered and cut in the database
+        filters = ["t.route_id = :rId"]
+        params = {'rId': route_id, 'lim': limit + 1}
         
-        if not trips:
-             return {"message": "No trips found for this route", 'data': []}
-
-        # 3. Build DTOs
-        for trip in trips:
-            # Fetch Bus Details for this trip
-            bus_response = bRouter.getBusById(trip.bus_id, session)
-            bus_data = bus_response['data'] # This is the Pydantic Object
-            
-            tCount= session.exec(
-                text("select count(*) from tripseats where trip_id = :tId"),
-                params={'tId': trip.id}
-            ).one()
-            seatsAvailable = bus_data.total_seat - tCount[0]
-            
-            session.exec(
-                text("update trips set seatsAvailable = :sA where id = :tId"),
-                params={'sA': seatsAvailable, 'tId': trip.id}
-            )
-            session.commit()
+        # Each day is its own slice of ix_trips_route_date; trips created without a date form the null slice
+        # and run every day, so a dated search reads both
+        if travel_date:
+            filters.append("(t.travel_date = :day or t.travel_date is null)")
+            params['day'] = str(travel_date)
+        else:
+            filters.append("t.travel_date is null")
+        
+        # Unchanged since the client's last poll: one index probe instead of the trips query.
+        # Trips added or removed move the count or max id; any booking or cancel moves the version sum.
+        state = (await session.exec(
+            text(f"select count(*), coalesce(max(t.id), 0), coalesce(sum(t.version), 0) from trips t where {' and '.join(filters)}"),
+            params=params
+        )).one()
+        etag = make_etag("trips", route_id, *state, sorted(request.query_params.multi_items()))
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
+        response.headers.update(etag_headers(etag))
+        
+        if air_type:
+            filters.append("b.air_type in :airTypes")
+            params['airTypes'] = [a.value for a in air_type]
+        if seat_type:
+            filters.append("b.seat_type in :seatTypes")
+            params['seatTypes'] = [s.value for s in seat_type]
+        if depart_after:
+            filters.append("t.departure_time >= :dAfter")
+            params['dAfter'] = str(depart_after)
+        if depart_before:
+            filters.append("t.departure_time <= :dBefore")
+            params['dBefore'] = str(depart_before)
+        if min_price is not None:
+            filters.append("t.price >= :minPrice")
+            params['minPrice'] = min_price
+        if max_price is not None:
+            filters.append("t.price <= :maxPrice")
+            params['maxPrice'] = max_price
+        if min_seats:
+            filters.append("t.seatsAvailable >= :minSeats")
+            params['minSeats'] = min_seats
+        
+        key, desc = TRIP_SORTS[sort]
+        order = f"{key} {'desc' if desc else 'asc'}, t.id" if key else "t.id"
+        
+        # Keyset on (sort key, id): resume strictly after the last row of the previous page
+        if cursor:
+            try:
+                cSort, cKey, cId = decode_cursor(cursor)
+                params['cId'] = int(cId)
+            except (TypeError, ValueError):
+                raise HTTPException(status_code=400, detail="Invalid cursor")
+            if cSort != sort:
+                raise HTTPException(status_code=400, detail="Cursor belongs to a different sort order")
+            if key:
+                params['cKey'] = cKey
+                filters.append(f"({key} {'<' if desc else '>'} :cKey or ({key} = :cKey and t.id > :cId))")
+            else:
+                filters.append("t.id > :cId")
+        
+        # 3. Get Trips with bus details in one query
+        # seatsAvailable is kept in step by booking/cancel, so no tripseats count is needed
+        query = text(f"""
+            select t.id, b.operator, b.id as bus_id, b.air_type, b.seat_type,
+                   t.departure_time, t.arrival_time, b.rating, t.price, t.seatsAvailable, t.travel_date
+            from trips t
+            join buses b on b.id = t.bus_id
+            where {" and ".join(filters)}
+            order by {order}
+            limit :lim
+            """)
+        for name in ('airTypes', 'seatTypes'):
+            if name in params:
+                query = query.bindparams(bindparam(name, expanding=True))
+        
+        rows = (await session.exec(query, params=params)).all()
+        
+        if not rows:
+             return {"message": "No trips found for this route", 'data': [], 'next_cursor': None}
 
-            btDetail = GetTripDetails(
-                id=trip.id,
-                operator=bus_data.operator,
-                bus_id=bus_data.id,
-                air_type=bus_data.air_type,
-                seat_type=bus_data.seat_type,
-                departure_time=trip.departure_time,
-                arrival_time=trip.arrival_time,
-                rating=bus_data.rating,
-                price=trip.price,
-                seatsAvailable=seatsAvailable
-            )
-            busTripDetails.append(btDetail)
+        # 4. Build DTOs
+        # One extra row was fetched to know whether another page exists
+        busTripDetails: List[GetTripDetails] = [GetTripDetails(**row._mapping) for row in rows[:limit]]
         
-        return {"message": "trip data fetched", 'data': busTripDetails}
+        next_cursor = None
+        if len(rows) > limit:
+            last = busTripDetails[-1]
+            next_cursor = encode_cursor(sort, getattr(last, key.split(".")[1]) if key else None, last.id)
+        
+        return {"message": "trip data fetched", 'data': busTripDetails, 'next_cursor': next_cursor}
+
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
+@router.get("/{tripId}/seatmap")
+async def getTripSeatMap(
+    tripId: int,
+    request: Request,
+    response: Response,
+    encoding: Literal["bitmap", "rle"] = Query("bitmap"),
+    session: AsyncSession = Depends(getAsyncSession)
+):
+    try:
+        version = (await session.exec(text("select version from trips where id = :tId"), params={'tId': tripId})).first()
+        etag = make_etag("seatmap", tripId, version and version[0], encoding)
+        cached = not_modified(request, etag) if version else None
+        if cached:
+            return cached
+        
+        # Layout of the trip's bus and this trip's bookings in one query
+        result = await session.exec(
+            text("""
+            select t.bus_id, s.id, s.seat_label, ts.id is not null as booked
+            from trips t
+            join seats s on s.bus_id = t.bus_id
+            left join tripseats ts on ts.trip_id = t.id and ts.seat_id = s.id
+            where t.id = :tId
+            order by s.id
+            """),
+            params={'tId': tripId}
+        )
+        rows = result.all()
+        
+        if not rows:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Seat map for Trip ID {tripId} not found")
+        
+        booked = [bool(r.booked) for r in rows]
+        response.headers.update(etag_headers(etag))
+        
+        return {
+            "message": "seat map fetched",
+            "data": SeatMapDetail(
+                trip_id=tripId,
+                bus_id=rows[0].bus_id,
+                seat_ids=[r.id for r in rows],
+                seat_labels=[r.seat_label for r in rows],
+                encoding=encoding,
+                occupancy=encode_bitmap(booked) if encoding == "bitmap" else encode_rle(booked),
+                booked=sum(booked)
+            )
+        }
     except HTTPException as he:
         raise he
     except Exception as e:
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
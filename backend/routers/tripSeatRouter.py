@@ -1,21 +1,31 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, text
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlmodel import text
+from sqlmodel.ext.asyncio.session import AsyncSession
 from typing import List
-from database import getSession
+from database import getAsyncSession
 from dto.tripSeatDto import TripSeatDetail
 from models.TripSeats import TripSeats
+from utils.versionStamp import make_etag, etag_headers, not_modified
 
 router = APIRouter(prefix="/tripSeat",tags=['TripSeats'])
 
 @router.get("/{tripId}")
-def getTripSeatsByTripId(tripId: int, session: Session = Depends(getSession)):
+async def getTripSeatsByTripId(tripId: int, request: Request, response: Response, session: AsyncSession = Depends(getAsyncSession)):
     try:
-        result = session.exec(text("select * from tripseats where trip_id = :tId"), params={"tId": tripId})
+        # trips.version moves with every booking and cancel on the trip
+        version = (await session.exec(text("select version from trips where id = :tId"), params={'tId': tripId})).first()
+        etag = make_etag("tripseats", tripId, version and version[0])
+        cached = not_modified(request, etag) if version else None
+        if cached:
+            return cached
+        
+        result = await session.exec(text("select * from tripseats where trip_id = :tId"), params={"tId": tripId})
         trip_seats: List[TripSeats] = result.all()
         
         if not trip_seats:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"TripSeats for Trip ID {tripId} not found")
         
+        response.headers.update(etag_headers(etag))
         tsd: List[TripSeatDetail] = [TripSeatDetail(id=ts.id, trip_id=ts.trip_id, seat_id=ts.seat_id) for ts in trip_seats]
         
         return {
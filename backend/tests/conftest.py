@@ -0,0 +1,88 @@
+import os
+
+# authUtil reads these at import time; tests must run without a .env file
+os.environ.setdefault("SECRET_KEY", "test-secret")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "15")
+os.environ.setdefault("REFRESH_TOKEN_EXPIRE_DAYS", "7")
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import database
+from utils.refCache import caches
+from routers.authApi import known_users
+from utils import queryWatchdog
+
+ADMIN = {'name': "admin", 'email': "admin@example.com", 'password': "admin-password", 'role': "admin"}
+
+@pytest.fixture
+def db(tmp_path):
+    # Every test gets its own SQLite file; in-process caches are cleared so nothing leaks across
+    url = f"sqlite:///{tmp_path / 'test.db'}"
+    saved = database.engine, database.async_engine
+    database.engine = database.make_engine(url)
+    database.async_engine = database.make_async_engine(url)
+    database.create_db_and_tables()
+    for cache in caches.values():
+        cache.drop(None)
+    known_users.clear()
+    yield database.engine
+    database.engine.dispose()
+    database.engine, database.async_engine = saved
+
+@pytest.fixture
+def client(db):
+    from main import app
+    # Auth cookies are marked secure, so the client must talk https to get them back
+    with TestClient(app, base_url="https://testserver") as c:
+        c.post("/register", json=ADMIN)
+        assert c.post("/login", json={'email': ADMIN['email'], 'password': ADMIN['password']}).status_code == 200
+        yield c
+
+@pytest.fixture
+def seed(client):
+    # Route start_city -> end_city with one bus and one undated trip per departure; returns trip ids
+    def make(buses: int = 1, seats: int = 10, start_city: str = "a", end_city: str = "b", travel_date=None):
+        client.post("/routes/add", json={'start_city': start_city, 'end_city': end_city, 'distance_km': 100})
+        trips = []
+        for i in range(buses):
+            number = f"{start_city}-{end_city}-{i}-{travel_date}"
+            assert client.post("/buses/add", json={'operator': "op", 'bus_number': number, 'air_type': "AC",
+                                                   'seat_type': "Seater", 'total_seat': seats, 'rating': 4}).status_code == 200
+            assert client.post("/trips/", json={'bus_number': number, 'start_city': start_city, 'end_city': end_city,
+                                                'departure_time': f"{8 + i // 6:02d}:{i % 6 * 10:02d}:00", 'arrival_time': "20:00:00",
+                                                'price': 100 + i, 'travel_date': travel_date}).status_code == 200
+        with database.engine.connect() as conn:
+            trips = [row[0] for row in conn.exec_driver_sql("select id from trips order by id").fetchall()]
+        return trips[-buses:]
+    return make
+
+@pytest.fixture
+def statements():
+    # SQL statements sent on any engine while the test runs; an executemany counts once
+    seen = []
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        seen.append(statement)
+    event.listen(Engine, "before_cursor_execute", listener)
+    yield seen
+    event.remove(Engine, "before_cursor_execute", listener)
+
+@pytest.fixture
+def query_watchdog(request):
+    # Statements run by the test itself raise on a repeat. Requests only log theirs, so a router's
+    # except-all does not hide one behind a 500, and the test fails at teardown with the list.
+    settings = queryWatchdog.settings
+    saved = (settings.enabled, settings.action)
+    settings.enabled, settings.action = True, "warn"
+    repeats = []
+    queryWatchdog.reported_repeats.append(repeats)
+    try:
+        with queryWatchdog.watch_queries(lambda: request.node.nodeid, action="raise") as watch:
+            yield watch
+    finally:
+        queryWatchdog.reported_repeats.remove(repeats)
+        settings.enabled, settings.action = saved
+    if repeats:
+        pytest.fail("\n".join(repeats), pytrace=False)
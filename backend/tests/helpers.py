@@ -0,0 +1,12 @@
+import database
+
+# Shared by test modules; fixtures live in conftest.py
+
+def free_seats(trip_id: int) -> list:
+    with database.engine.connect() as conn:
+        return [row[0] for row in conn.exec_driver_sql(
+            "select s.id from seats s join trips t on t.bus_id = s.bus_id where t.id = ? order by s.id", (trip_id,)
+        ).fetchall()]
+
+def book(client, trip_id: int, seats: list):
+    return client.post("/booking/add", json=[{'trip_id': trip_id, 'price': 100, 'seat_id': s} for s in seats])
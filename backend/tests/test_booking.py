@@ -0,0 +1,27 @@
+import database
+from tests.helpers import book, free_seats
+
+def test_booking_statement_count_does_not_grow_with_seats(client, seed, statements):
+    warm, one, many = seed(buses=3, seats=10)
+    # First booking fills the user and token caches; only later ones are compared
+    assert book(client, warm, free_seats(warm)[:1]).status_code == 200
+
+    statements.clear()
+    assert book(client, one, free_seats(one)[:1]).status_code == 200
+    single = len(statements)
+
+    statements.clear()
+    assert book(client, many, free_seats(many)[:6]).status_code == 200
+    assert len(statements) == single
+
+def test_booking_updates_seats_available(client, seed):
+    trip, = seed(seats=10)
+    assert book(client, trip, free_seats(trip)[:3]).status_code == 200
+    with database.engine.connect() as conn:
+        assert conn.exec_driver_sql("select seatsAvailable from trips where id = ?", (trip,)).scalar() == 7
+
+def test_double_booking_a_seat_is_rejected(client, seed):
+    trip, = seed()
+    seat = free_seats(trip)[0]
+    assert book(client, trip, [seat]).status_code == 200
+    assert book(client, trip, [seat]).status_code == 409
@@ -0,0 +1,49 @@
+import pytest
+from sqlmodel import Session
+import database
+from utils.bulkImport import Importer, RouteImporter, import_lines
+
+ROUTES = [
+    "start_city,end_city,distance_km\n",
+    "a,b,100\n",
+    "b,c,not-a-number\n",
+    "c,d,300\n",
+]
+
+def route_pairs():
+    with database.engine.connect() as conn:
+        return conn.exec_driver_sql("select start_city, end_city from routes order by id").fetchall()
+
+def test_importer_needs_an_insert():
+    with pytest.raises(TypeError):
+        Importer()
+
+def test_bad_csv_row_is_reported_and_the_rest_land(db):
+    with Session(database.engine) as session:
+        report = import_lines(session, "routes", ROUTES, "csv")
+    assert report['imported'] == 2 and report['failed'] == 1
+    assert [e['row'] for e in report['errors']] == [3]
+    assert "distance_km" in report['errors'][0]['error']
+    assert route_pairs() == [("a", "b"), ("c", "d")]
+
+class RacingRouteImporter(RouteImporter):
+    # Another writer adds c -> d after the batch was checked against the table
+    def resolve(self, session, rows):
+        kept = super().resolve(session, rows)
+        with database.engine.begin() as conn:
+            conn.exec_driver_sql("insert into routes(start_city,end_city,start_key,end_key,distance_km) values('C','D','c','d',1)")
+        return kept
+
+def test_batch_rejected_by_the_database_is_retried_row_by_row(db):
+    importer = RacingRouteImporter()
+    rows = [(2, {'start_city': "a", 'end_city': "b", 'distance_km': 100}),
+            (3, {'start_city': "c", 'end_city': "d", 'distance_km': 300}),
+            (4, {'start_city': "e", 'end_city': "f", 'distance_km': 500})]
+    with Session(database.engine) as session:
+        assert importer.write(session, rows) == 2
+
+    report = importer.report()
+    assert report['imported'] == 2 and report['failed'] == 1
+    assert report['errors'][0]['row'] == 3
+    assert report['errors'][0]['error'].startswith("rejected by the database")
+    assert route_pairs() == [("C", "D"), ("a", "b"), ("e", "f")]
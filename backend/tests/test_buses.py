@@ -0,0 +1,16 @@
+import database
+
+BUS = {'operator': "op", 'bus_number': "B1", 'air_type': "AC", 'seat_type': "Sleeper", 'total_seat': 6, 'rating': 4}
+
+def test_add_bus_writes_layout(client):
+    assert client.post("/buses/add", json=BUS).status_code == 200
+    with database.engine.connect() as conn:
+        labels = [row[0] for row in conn.exec_driver_sql("select seat_label from seats order by id").fetchall()]
+    assert labels == ["1A", "1B", "2A", "2B", "3A", "3B"]
+
+def test_add_bus_without_seats_is_rejected(client):
+    for total in (0, -3):
+        response = client.post("/buses/add", json={**BUS, 'total_seat': total})
+        assert response.status_code == 400
+    with database.engine.connect() as conn:
+        assert conn.exec_driver_sql("select count(*) from buses").scalar() == 0
@@ -0,0 +1,64 @@
+import asyncio
+from collections import namedtuple
+from sqlmodel.ext.asyncio.session import AsyncSession
+import database
+from utils.connectionGraph import ConnectionGraph
+
+Row = namedtuple("Row", "id route_id start_city end_city departure_time arrival_time price travel_date")
+
+def graph(*rows):
+    g = ConnectionGraph("test_connections")
+    g.add_trips([Row(*row, None) for row in rows])
+    return g
+
+def trip_ids(results):
+    return [[leg['trip_id'] for leg in r['legs']] for r in results]
+
+def test_earlier_arrival_whose_layover_window_closes_does_not_hide_a_later_one():
+    g = graph(
+        (1, 1, "a", "x", "08:00:00", "09:00:00", 10),
+        (2, 1, "a", "x", "09:00:00", "11:00:00", 10),
+        (3, 2, "x", "b", "11:30:00", "12:00:00", 10),
+    )
+    for k in (1, 2):
+        assert trip_ids(g.search("a", "b", min_layover=0, max_layover=60, k=k)) == [[2, 3]]
+
+def test_later_departure_into_the_same_connection_ranks_first():
+    # Both feeders reach x at 10:00; the one leaving later is shorter end to end
+    g = graph(
+        (1, 1, "a", "x", "07:00:00", "10:00:00", 10),
+        (2, 1, "a", "x", "09:00:00", "10:00:00", 10),
+        (3, 2, "x", "b", "10:30:00", "11:00:00", 10),
+    )
+    assert trip_ids(g.search("a", "b", k=1)) == [[2, 3]]
+    assert trip_ids(g.search("a", "b", k=2)) == [[2, 3], [1, 3]]
+
+def insert_trip(id, start_city, end_city, departs, arrives):
+    with database.engine.begin() as conn:
+        conn.exec_driver_sql("insert or ignore into routes(id,start_city,end_city,start_key,end_key,distance_km) values(?,?,?,?,?,100)",
+                             (id, start_city, end_city, start_city, end_city))
+        conn.exec_driver_sql("insert or ignore into buses(id,operator,bus_number,air_type,seat_type,total_seat,rating) values(1,'op','B1','AC','Seater',4,4)")
+        conn.exec_driver_sql("insert into trips(id,bus_id,route_id,departure_time,arrival_time,price,seatsAvailable) values(?,1,?,?,?,10,4)",
+                             (id, id, departs, arrives))
+
+def refresh(g):
+    # As after a trip write: marked stale, reloaded by the next search
+    async def run():
+        async with AsyncSession(database.async_engine) as session:
+            await g.refresh(session)
+    g.drop()
+    asyncio.run(run())
+
+def test_trip_committed_below_the_loaded_ids_is_picked_up(db):
+    g = ConnectionGraph("test_connections")
+    insert_trip(5, "a", "x", "08:00:00", "09:00:00")
+    refresh(g)
+    insert_trip(6, "y", "z", "08:00:00", "09:00:00")
+    refresh(g)
+    assert g.stats()['rebuilds'] == 0
+
+    # Took its id before trip 6 but committed after it, as MySQL auto-increment allows
+    insert_trip(3, "x", "b", "10:00:00", "11:00:00")
+    refresh(g)
+    assert g.stats()['rebuilds'] == 1
+    assert trip_ids(g.search("a", "b", k=1)) == [[5, 3]]
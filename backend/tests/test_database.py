@@ -0,0 +1,10 @@
+import pytest
+from database import async_url
+
+def test_async_url_picks_async_driver():
+    assert async_url("sqlite:///./project.db") == "sqlite+aiosqlite:///./project.db"
+    assert async_url("mysql+pymysql://u:p@host/db") == "mysql+aiomysql://u:p@host/db"
+
+def test_async_url_rejects_unsupported_backend():
+    with pytest.raises(ValueError, match="mysql, sqlite"):
+        async_url("postgresql://u:p@host/db")
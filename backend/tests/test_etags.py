@@ -0,0 +1,22 @@
+import database
+
+def search(client, headers=None):
+    return client.get("/trips/get", params={'start_city': "a", 'end_city': "b"}, headers=headers or {})
+
+def test_unchanged_search_answers_not_modified(client, seed):
+    seed()
+    first = search(client)
+    assert first.status_code == 200
+    assert search(client, {'If-None-Match': first.headers['etag']}).status_code == 304
+
+def test_write_from_another_process_changes_etags(client, seed):
+    trip, = seed()
+    listing = search(client).headers['etag']
+    seatmap = client.get(f"/trips/{trip}/seatmap").headers['etag']
+
+    # Another worker books a seat: nothing in this process is told, only the row changes
+    with database.engine.begin() as conn:
+        conn.exec_driver_sql("update trips set seatsAvailable = seatsAvailable - 1, version = version + 1 where id = ?", (trip,))
+
+    assert search(client, {'If-None-Match': listing}).status_code == 200
+    assert client.get(f"/trips/{trip}/seatmap", headers={'If-None-Match': seatmap}).status_code == 200
@@ -0,0 +1,19 @@
+from utils.metrics import metrics
+
+def test_metrics_cover_routes_and_caches(client, seed):
+    trip, = seed()
+    # Route series live for the whole process; earlier tests hit the same routes
+    metrics.routes.clear()
+    client.get("/trips/get", params={'start_city': "a", 'end_city': "b"})
+    client.get(f"/trips/{trip}/seatmap")
+    client.get(f"/trips/{trip}/seatmap")
+
+    text = client.get("/metrics").text
+    assert 'http_request_duration_seconds_count{method="GET",route="/trips/{tripId}/seatmap"} 2' in text
+    assert 'db_statements_total{method="GET",route="/trips/get"}' in text
+    # Reference caches from utils.refCache
+    assert 'cache_hits{cache="buses"}' in text
+    assert 'cache_size{cache="routes"}' in text
+    # Auth caches: every authenticated request goes through both
+    assert 'cache_hits{cache="verified_tokens"}' in text
+    assert 'cache_misses{cache="known_users"}' in text
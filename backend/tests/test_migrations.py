@@ -0,0 +1,41 @@
+import pytest
+from sqlalchemy import text
+from migrations import run_migrations
+
+def as_before_step_one(engine):
+    # A database from before migration 1: no unique indexes, no route keys and no recorded versions
+    with engine.begin() as conn:
+        conn.execute(text("drop index uq_routes_start_end_key"))
+        conn.execute(text("drop index uq_tripseats_trip_seat"))
+        conn.execute(text("alter table routes drop column start_key"))
+        conn.execute(text("alter table routes drop column end_key"))
+        conn.execute(text("delete from schema_version"))
+
+def test_duplicate_routes_are_merged_on_keys_and_names_kept(db):
+    as_before_step_one(db)
+    with db.begin() as conn:
+        # The exact-name pair index the first version of migration 1 created
+        conn.execute(text("create unique index uq_routes_start_end on routes(start_city, end_city)"))
+        conn.execute(text("insert into routes(id,start_city,end_city,distance_km) values(1,'New Delhi','Agra',230),(2,'new  delhi',' AGRA',230),(3,'Udupi','Goa',300)"))
+        conn.execute(text("insert into buses(id,operator,bus_number,air_type,seat_type,total_seat,rating) values(1,'op','B1','AC','Seater',4,4)"))
+        conn.execute(text("insert into trips(id,bus_id,route_id,departure_time,arrival_time,price,seatsAvailable) values(1,1,1,'08:00:00','12:00:00',100,4),(2,1,2,'09:00:00','13:00:00',100,4)"))
+
+    run_migrations(db)
+
+    with db.connect() as conn:
+        assert conn.execute(text("select id, start_city, end_city, start_key, end_key from routes order by id")).all() == [
+            (1, "New Delhi", "Agra", "new delhi", "agra"), (3, "Udupi", "Goa", "udupi", "goa")]
+        assert [r[0] for r in conn.execute(text("select route_id from trips order by id"))] == [1, 1]
+        indexes = {r[0] for r in conn.execute(text("select name from sqlite_master where type = 'index'"))}
+        assert "uq_routes_start_end_key" in indexes and "uq_routes_start_end" not in indexes
+
+def test_double_booked_seat_stops_migration_with_a_clear_message(db):
+    as_before_step_one(db)
+    with db.begin() as conn:
+        conn.execute(text("insert into tripseats(trip_id, seat_id) values(7, 3), (7, 3)"))
+
+    with pytest.raises(RuntimeError, match="trip 7 seat 3"):
+        run_migrations(db)
+    # Nothing from the failed step is recorded, so the next start retries it
+    with db.connect() as conn:
+        assert conn.execute(text("select count(*) from schema_version where version = 1")).scalar() == 0
@@ -0,0 +1,36 @@
+import benchmarks.benchUtil as bu
+import database
+from benchmarks.queryPlans import capture, endpoint_calls, scans
+from routers.authApi import known_users
+from utils.refCache import caches
+
+def test_router_queries_do_not_scan_whole_tables(db):
+    # Same endpoint walk as benchmarks/queryPlans.py: every statement must be planned as an index search
+    bu.seed(routes=20, trips_per_route=5, seats_per_bus=40, users=50)
+    from main import app
+    client = bu.logged_in_client(app)
+    statements = []
+    capture(database.engine, statements)
+    capture(database.async_engine.sync_engine, statements)
+
+    failures = []
+    try:
+        for label, call in endpoint_calls(client):
+            # Cold caches, so lookups that normally hit memory still reach the database
+            known_users.clear()
+            for cache in caches.values():
+                cache.drop(None)
+            statements.clear()
+            response = call()
+            assert response.status_code < 400, f"{label}: HTTP {response.status_code} {response.text}"
+
+            with database.engine.connect() as conn:
+                raw = conn.connection.dbapi_connection
+                for statement, parameters in statements:
+                    bad = scans(raw.execute("EXPLAIN QUERY PLAN " + statement, parameters).fetchall())
+                    if bad:
+                        failures.append(f"{label}: {' '.join(statement.split())[:120]} -> {bad}")
+    finally:
+        client.__exit__(None, None, None)
+
+    assert not failures, "\n".join(failures)
@@ -0,0 +1,51 @@
+import logging
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlmodel import text
+import database
+from utils import queryWatchdog
+from utils.queryWatchdog import RepeatedQueryError, watchdog_middleware
+from tests.helpers import book, free_seats
+
+BUS_BY_ID = text("select * from buses where id = :bId")
+
+def test_lookup_in_a_loop_raises_in_the_test(db, query_watchdog):
+    with database.engine.connect() as conn:
+        with pytest.raises(RepeatedQueryError):
+            for bus_id in range(1, 10):
+                conn.execute(BUS_BY_ID, {'bId': bus_id})
+
+def test_lookup_in_a_loop_is_reported_from_a_request(db, monkeypatch):
+    # A getBusById call per item, served through the middleware the fixture listens to
+    app = FastAPI()
+    app.middleware("http")(watchdog_middleware)
+
+    @app.get("/buses/each")
+    def each():
+        with database.engine.connect() as conn:
+            for bus_id in range(1, 10):
+                conn.execute(BUS_BY_ID, {'bId': bus_id})
+
+    repeats = []
+    monkeypatch.setattr(queryWatchdog.settings, "enabled", True)
+    monkeypatch.setattr(queryWatchdog, "reported_repeats", [repeats])
+    TestClient(app).get("/buses/each")
+    assert len(repeats) == 1
+    assert "in GET /buses/each: select * from buses where id = ?" in repeats[0]
+
+def test_set_based_endpoints_pass(client, seed, query_watchdog):
+    trip, = seed(seats=10)
+    assert book(client, trip, free_seats(trip)[:8]).status_code == 200
+    assert client.get("/booking/get").status_code == 200
+    assert client.get(f"/trips/{trip}/seatmap").status_code == 200
+
+def test_slow_query_is_logged_with_params_and_endpoint(client, seed, caplog, monkeypatch):
+    trip, = seed()
+    monkeypatch.setattr(queryWatchdog.settings, "enabled", True)
+    monkeypatch.setattr(queryWatchdog.settings, "slow_ms", 0)
+    with caplog.at_level(logging.WARNING, logger=queryWatchdog.__name__):
+        client.get(f"/trips/{trip}/seatmap")
+    message = next(r.getMessage() for r in caplog.records if "select version from trips" in r.getMessage())
+    assert " in GET /trips/{tripId}/seatmap: " in message
+    assert message.endswith(f"params=({trip},)")
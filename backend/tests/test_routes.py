@@ -0,0 +1,10 @@
+def add_route(client, start_city, end_city):
+    return client.post("/routes/add", json={'start_city': start_city, 'end_city': end_city, 'distance_km': 230})
+
+def test_route_keeps_its_names_and_matches_on_keys(client):
+    assert add_route(client, "New Delhi", "Agra").status_code == 200
+
+    found = client.get("/routes/", params={'start_city': "new  delhi", 'end_city': "AGRA"}).json()['data']
+    assert (found['start_city'], found['end_city']) == ("New Delhi", "Agra")
+    assert add_route(client, "NEW DELHI", "agra ").status_code == 409
+    assert client.get("/routes/cities/suggest", params={'q': "new"}).json()['data'][0]['city'] == "New Delhi"
@@ -0,0 +1,27 @@
+def search(client, **params):
+    return client.get("/trips/get", params={'start_city': "a", 'end_city': "b", **params})
+
+def test_dated_search_includes_undated_trips(client, seed):
+    undated, = seed()
+    dated, = seed(travel_date="2026-03-01")
+    seed(travel_date="2026-03-02")
+
+    found = [t['id'] for t in search(client, travel_date="2026-03-01").json()['data']]
+    assert sorted(found) == sorted([undated, dated])
+    assert [t['id'] for t in search(client).json()['data']] == [undated]
+
+def test_search_statement_count_does_not_grow_with_trips(client, seed, statements):
+    seed(buses=2, start_city="a", end_city="b")
+    seed(buses=24, start_city="c", end_city="d")
+    few, many = {'start_city': "a", 'end_city': "b"}, {'start_city': "c", 'end_city': "d"}
+    # First searches fill the route cache; only later ones are compared
+    client.get("/trips/get", params=few)
+    client.get("/trips/get", params=many)
+
+    statements.clear()
+    assert len(client.get("/trips/get", params=few).json()['data']) == 2
+    two = len(statements)
+
+    statements.clear()
+    assert len(client.get("/trips/get", params=many).json()['data']) == 24
+    assert len(statements) == two
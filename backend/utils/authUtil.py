@@ -3,6 +3,11 @@ from passlib.context import CryptContext
 from datetime import datetime,timedelta,timezone
 from jose import jwt, JWTError
 from dotenv import load_dotenv
+from concurrent.futures import ThreadPoolExecutor
+from utils.cache import LRUCache
+import asyncio
+import hashlib
+import hmac
 import os
 
 load_dotenv()
@@ -11,6 +16,17 @@ SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS"))
+# Refresh tokens are stored as a keyed digest; a leaked table is useless without this key
+REFRESH_TOKEN_HMAC_KEY = os.getenv("REFRESH_TOKEN_HMAC_KEY", SECRET_KEY)
+
+# bcrypt is deliberately slow, so it gets its own small pool instead of the request threadpool
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", os.cpu_count() or 2))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64))
+hash_pool = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+hash_pending = 0
+
+# Access tokens already verified, keyed by digest so raw tokens are never held in memory
+verified_tokens = LRUCache(maxsize=int(os.getenv("TOKEN_CACHE_SIZE", 10000)))
 
 pwd_context = CryptContext(schemes=["bcrypt"],deprecated="auto")
 
@@ -20,6 +36,29 @@ def hash_password(password: str) -> str:
 def verify_password(password:str,hashed:str)->bool:
     return pwd_context.verify(password,hashed)
 
+async def run_password_hashing(fn, *args):
+    # Shed load once the queue is deep rather than letting logins pile up behind each other
+    global hash_pending
+    if hash_pending >= PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(status_code=503, detail="Server busy, please retry", headers={"Retry-After": "1"})
+    hash_pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(hash_pool, fn, *args)
+    finally:
+        hash_pending -= 1
+
+async def hash_password_async(password: str) -> str:
+    return await run_password_hashing(hash_password, password)
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await run_password_hashing(verify_password, password, hashed)
+
+def hash_refresh_token(token: str) -> str:
+    return hmac.new(REFRESH_TOKEN_HMAC_KEY.encode(), token.encode(), hashlib.sha256).hexdigest()
+
+def verify_refresh_token(token: str, digest: str) -> bool:
+    return hmac.compare_digest(hash_refresh_token(token), digest)
+
 def create_access_token(data: dict):
     to_encode = data.copy()
     exp = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
@@ -41,3 +80,21 @@ def verify_token(token : str ):
         return email
     except JWTError:
         raise HTTPException(status_code=401 , detail="Token is invalid or expired")
+
+def verify_token_cached(token: str) -> dict:
+    key = hashlib.sha256(token.encode()).digest()
+    claims = verified_tokens.get(key)
+    if claims is not None:
+        return claims
+
+    try:
+        payload = jwt.decode(token=token,key=SECRET_KEY,algorithms=[ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=401 , detail="Token is invalid or expired")
+    if payload.get('sub') is None :
+        raise HTTPException(status_code=401 , detail="Token is invalid or expired")
+
+    # The entry lapses exactly when the token does, so expiry is still enforced
+    if payload.get('exp') is not None:
+        verified_tokens.set(key, payload, expires_at=payload['exp'])
+    return payload
@@ -0,0 +1,355 @@
+from abc import ABC, abstractmethod
+from sqlalchemy import bindparam
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, text
+from pydantic import BaseModel, ValidationError
+from typing import Dict, Iterable, List, Optional, Tuple
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+import database
+from dto.busDto import AddBusDetail
+from dto.routeDto import AddRouteDetail
+from dto.tripDetail import AddBusTripDetail
+from utils.cityUtil import normalize_city
+from utils.seatLayout import generate_seat_labels
+from utils.refCache import bus_cache, route_cache, shares_invalidations
+from utils.versionStamp import bus_versions
+from utils.connectionGraph import connection_graph
+from utils.cityIndex import city_index
+
+# Bulk onboarding of buses, routes and trips from CSV or NDJSON. Input is parsed a batch of lines
+# at a time; each batch resolves bus numbers and city pairs with one query apiece, is written with
+# executemany and committed on its own. A batch the database rejects is retried row by row so the
+# report names the offending rows and the rest still land. Shared by POST /import/{kind} and the CLI.
+# A server already running on the same database sees CLI imports in its caches, city index and
+# connection graph only after a restart, unless both share REF_CACHE_INVALIDATION_FILE.
+
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 1000))
+MAX_REPORTED_ERRORS = 1000
+
+Row = Tuple[int, object]   # (line number in the input, validated row or its insert parameters)
+
+class RowError(Exception):
+    pass
+
+class RecordParser:
+    # Turns lines into (line number, dict). CSV takes its columns from the header line; a quoted
+    # field spanning lines is held back until its record is complete, even across feed() calls.
+    def __init__(self, fmt: str):
+        if fmt not in ("csv", "ndjson"):
+            raise ValueError("format must be csv or ndjson")
+        self.fmt = fmt
+        self.header: Optional[List[str]] = None
+        self.line = 0
+        self.pending: List[str] = []
+        self.pending_start = 0
+
+    def feed(self, lines: Iterable[str]) -> List[Tuple[int, object]]:
+        records = []
+        for line in lines:
+            self.line += 1
+            if self.fmt == "ndjson":
+                if line.strip():
+                    try:
+                        records.append((self.line, json.loads(line)))
+                    except ValueError as e:
+                        records.append((self.line, RowError(f"invalid JSON: {e}")))
+                continue
+
+            if not self.pending:
+                if not line.strip():
+                    continue
+                self.pending_start = self.line
+            self.pending.append(line)
+            if sum(part.count('"') for part in self.pending) % 2:
+                continue
+            values = next(csv.reader(["".join(self.pending)]), [])
+            self.pending = []
+            if self.header is None:
+                self.header = [h.strip() for h in values]
+            elif len(values) != len(self.header):
+                records.append((self.pending_start, RowError(f"expected {len(self.header)} columns, got {len(values)}")))
+            else:
+                # Empty cells are missing values, so optional columns may be left blank
+                records.append((self.pending_start, {k: v for k, v in zip(self.header, values) if v != ""}))
+        return records
+
+    def finish(self) -> List[Tuple[int, object]]:
+        if self.pending:
+            self.pending = []
+            return [(self.pending_start, RowError("unterminated quoted field"))]
+        return []
+
+def describe(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, e['loc'])) or 'row'}: {e['msg']}" for e in error.errors())
+
+class Importer(ABC):
+    dto = BaseModel
+
+    def __init__(self):
+        self.imported = 0
+        self.errors: List[dict] = []
+        self.error_count = 0
+        self.started = time.perf_counter()
+
+    def fail(self, row: int, message: str):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row, 'error': message})
+
+    def validate(self, records) -> List[Row]:
+        rows = []
+        for line, record in records:
+            if isinstance(record, RowError):
+                self.fail(line, str(record))
+                continue
+            if not isinstance(record, dict):
+                self.fail(line, "expected an object")
+                continue
+            try:
+                rows.append((line, self.dto.model_validate(record)))
+            except ValidationError as e:
+                self.fail(line, describe(e))
+        return rows
+
+    def write(self, session: Session, records) -> int:
+        rows = self.validate(records)
+        if not rows:
+            return 0
+        rows = self.resolve(session, rows)
+        if not rows:
+            return 0
+        try:
+            self.insert(session, rows)
+            session.commit()
+            written = rows
+        except IntegrityError:
+            # Something in the batch collided (a concurrent writer or a duplicate the lookups could
+            # not see); redo it one row per transaction to find which
+            session.rollback()
+            written = []
+            for row in rows:
+                try:
+                    self.insert(session, [row])
+                    session.commit()
+                    written.append(row)
+                except IntegrityError as e:
+                    session.rollback()
+                    self.fail(row[0], f"rejected by the database: {e.orig}")
+        self.committed(written)
+        self.imported += len(written)
+        return len(written)
+
+    def resolve(self, session: Session, rows: List[Row]) -> List[Row]:
+        return rows
+
+    @abstractmethod
+    def insert(self, session: Session, rows: List[Row]):
+        ...
+
+    def committed(self, rows: List[Row]):
+        pass
+
+    def finish(self):
+        pass
+
+    def report(self) -> dict:
+        return {
+            'imported': self.imported,
+            'failed': self.error_count,
+            'seconds': round(time.perf_counter() - self.started, 3),
+            'errors': sorted(self.errors, key=lambda e: e['row']),
+            'errors_truncated': self.error_count > len(self.errors),
+        }
+
+class RouteImporter(Importer):
+    dto = AddRouteDetail
+
+    def __init__(self):
+        super().__init__()
+        self.pairs = set()
+
+    def resolve(self, session, rows):
+        wanted = {(normalize_city(r.start_city), normalize_city(r.end_city)) for _, r in rows}
+        existing = set(map(tuple, session.exec(
+            text("select start_key, end_key from routes where start_key in :starts").bindparams(bindparam('starts', expanding=True)),
+            params={'starts': sorted({s for s, _ in wanted})}
+        ).all()))
+        kept, seen = [], set()
+        for line, r in rows:
+            pair = (normalize_city(r.start_city), normalize_city(r.end_city))
+            if not all(pair) or pair[0] == pair[1]:
+                self.fail(line, "start_city and end_city must be two different cities")
+            elif r.distance_km <= 0:
+                self.fail(line, "distance_km must be positive")
+            elif pair in existing or pair in seen:
+                self.fail(line, f"route {pair[0]} -> {pair[1]} already exists")
+            else:
+                seen.add(pair)
+                kept.append((line, r))
+        return kept
+
+    def insert(self, session, rows):
+        session.execute(
+            text("insert into routes(start_city,end_city,start_key,end_key,distance_km) values(:e1,:e2,:e3,:e4,:e5)"),
+            [{'e1': r.start_city, 'e2': r.end_city, 'e3': normalize_city(r.start_city), 'e4': normalize_city(r.end_city),
+              'e5': r.distance_km} for _, r in rows]
+        )
+
+    def committed(self, rows):
+        self.pairs.update((r.start_city, r.end_city) for _, r in rows)
+
+    def finish(self):
+        for pair in self.pairs:
+            route_cache.invalidate(('se',) + tuple(map(normalize_city, pair)))
+            city_index.add_cities(*pair)
+
+class BusImporter(Importer):
+    dto = AddBusDetail
+
+    def __init__(self):
+        super().__init__()
+        self.ids = {}     # bus_number -> id, as read back after insert
+        self.buses = {}   # the committed ones
+
+    def resolve(self, session, rows):
+        existing = {row[0] for row in session.exec(
+            text("select bus_number from buses where bus_number in :numbers").bindparams(bindparam('numbers', expanding=True)),
+            params={'numbers': sorted({r.bus_number for _, r in rows})}
+        ).all()}
+        kept, seen = [], set()
+        for line, r in rows:
+            if r.bus_number in existing or r.bus_number in seen:
+                self.fail(line, f"bus {r.bus_number} already exists")
+                continue
+            if r.total_seat <= 0 or not 0 <= r.rating <= 5:
+                self.fail(line, "total_seat must be positive and rating between 0 and 5")
+                continue
+            try:
+                generate_seat_labels(r.total_seat, r.seat_type, r.seat_columns)
+            except ValueError as e:
+                self.fail(line, str(e))
+                continue
+            seen.add(r.bus_number)
+            kept.append((line, r))
+        return kept
+
+    def insert(self, session, rows):
+        session.execute(
+            text("insert into buses(operator,bus_number,air_type,seat_type,total_seat,rating) values(:e1,:e2,:e3,:e4,:e5,:e6)"),
+            [{'e1': r.operator, 'e2': r.bus_number, 'e3': r.air_type.value, 'e4': r.seat_type.value,
+              'e5': r.total_seat, 'e6': r.rating} for _, r in rows]
+        )
+        # executemany gives no per-row ids; read them back by bus number in one query
+        ids = dict(session.exec(
+            text("select bus_number, id from buses where bus_number in :numbers").bindparams(bindparam('numbers', expanding=True)),
+            params={'numbers': [r.bus_number for _, r in rows]}
+        ).all())
+        session.execute(
+            text("insert into seats(seat_label,bus_id) values(:sLabel,:bId)"),
+            [{'sLabel': label, 'bId': ids[r.bus_number]}
+             for _, r in rows for label in generate_seat_labels(r.total_seat, r.seat_type, r.seat_columns)]
+        )
+        self.ids.update(ids)
+
+    def committed(self, rows):
+        self.buses.update((r.bus_number, self.ids[r.bus_number]) for _, r in rows)
+
+    def finish(self):
+        for number, bus_id in self.buses.items():
+            bus_cache.invalidate(('id', bus_id))
+            bus_cache.invalidate(('number', number))
+            bus_versions.bump(bus_id)
+
+class TripImporter(Importer):
+    dto = AddBusTripDetail
+
+    def __init__(self):
+        super().__init__()
+        self.routes = set()
+
+    def resolve(self, session, rows):
+        buses = {row.bus_number: row for row in session.exec(
+            text("select id, bus_number, total_seat from buses where bus_number in :numbers").bindparams(bindparam('numbers', expanding=True)),
+            params={'numbers': sorted({r.bus_number for _, r in rows})}
+        ).all()}
+        routes = {(row.start_key, row.end_key): row.id for row in session.exec(
+            text("select id, start_key, end_key from routes where start_key in :starts").bindparams(bindparam('starts', expanding=True)),
+            params={'starts': sorted({normalize_city(r.start_city) for _, r in rows})}
+        ).all()}
+        kept = []
+        for line, r in rows:
+            bus = buses.get(r.bus_number)
+            route_id = routes.get((normalize_city(r.start_city), normalize_city(r.end_city)))
+            if not bus:
+                self.fail(line, f"bus number {r.bus_number} not found")
+            elif not route_id:
+                self.fail(line, f"route {normalize_city(r.start_city)} -> {normalize_city(r.end_city)} not found")
+            else:
+                kept.append((line, {
+                    'e1': bus.id, 'e2': route_id, 'e3': str(r.departure_time), 'e4': str(r.arrival_time), 'e5': r.price,
+                    'e6': bus.total_seat, 'e7': str(r.travel_date) if r.travel_date else None,
+                }))
+        return kept
+
+    def insert(self, session, rows):
+        session.execute(
+            text("insert into trips(bus_id,route_id,departure_time,arrival_time,price,seatsAvailable,travel_date) values(:e1,:e2,:e3,:e4,:e5,:e6,:e7)"),
+            [params for _, params in rows]
+        )
+
+    def committed(self, rows):
+        self.routes.update(params['e2'] for _, params in rows)
+
+    def finish(self):
+        if self.routes:
+            connection_graph.invalidate()
+
+IMPORTERS: Dict[str, type] = {'buses': BusImporter, 'routes': RouteImporter, 'trips': TripImporter}
+
+def import_lines(session: Session, kind: str, lines: Iterable[str], fmt: str, batch: int = IMPORT_BATCH_SIZE) -> dict:
+    importer, parser = IMPORTERS[kind](), RecordParser(fmt)
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= batch:
+            importer.write(session, parser.feed(chunk))
+            chunk = []
+    importer.write(session, parser.feed(chunk) + parser.finish())
+    importer.finish()
+    return importer.report()
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import buses, routes or trips from CSV or NDJSON")
+    parser.add_argument("kind", choices=sorted(IMPORTERS))
+    parser.add_argument("path", help="input file, - for stdin")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="default from the file extension")
+    parser.add_argument("--batch", type=int, default=IMPORT_BATCH_SIZE, help="rows per transaction")
+    parser.add_argument("--errors", help="write the per-row error report here as NDJSON")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+    source = sys.stdin if args.path == "-" else open(args.path, newline="", encoding="utf-8")
+    with source, Session(database.engine) as session:
+        report = import_lines(session, args.kind, source, fmt, args.batch)
+
+    print(f"{report['imported']} {args.kind} imported, {report['failed']} failed in {report['seconds']} s "
+          f"({report['imported'] / max(report['seconds'], 1e-9):,.0f} rows/s)")
+    if args.errors:
+        with open(args.errors, "w") as f:
+            for error in report['errors']:
+                f.write(json.dumps(error) + "\n")
+    else:
+        for error in report['errors'][:20]:
+            print(f"row {error['row']}: {error['error']}")
+    if report['errors_truncated']:
+        print(f"only the first {MAX_REPORTED_ERRORS} errors are listed")
+    if report['imported'] and not shares_invalidations():
+        print("REF_CACHE_INVALIDATION_FILE is not set: restart any server running on this database")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+from bisect import bisect_left, insort
+from collections import Counter
+from threading import Lock
+from typing import List, Optional
+from sqlmodel import Session, text
+from sqlmodel.ext.asyncio.session import AsyncSession
+import database
+from utils.cityUtil import normalize_city
+from utils.refCache import caches, invalidation_bus, apply_remote_invalidations
+
+# Autocomplete over every city in routes, served from memory. Exact prefixes come from a sorted
+# array (two bisects), later words of multi-word names from a second one, and typos from a
+# Levenshtein walk over a trie that gives up on a branch as soon as it is out of reach.
+# Matching runs on normalized names; suggestions come back as the routes spell them.
+
+LOAD_CITIES = "select start_city, end_city from routes"
+WORD = "$"   # trie key holding the full name at the node where it ends
+
+def max_typos(query: str) -> int:
+    # Short prefixes match too much to be worth correcting
+    return 0 if len(query) < 3 else 1 if len(query) < 8 else 2
+
+class CityIndex:
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self.names: List[str] = []      # normalized, sorted
+        self.display = {}               # normalized name -> name as first entered
+        self.words: List[tuple] = []    # (word, name) for every word after the first
+        self.trie = {}
+        self.routes = Counter()         # routes touching each city, used for ranking
+        self.loaded = False
+        self.lock = Lock()
+        caches[namespace] = self
+
+    def drop(self, key: Optional[str]):
+        # Remote event: another worker added a route touching this city
+        if key is None:
+            self.loaded = False
+        else:
+            self.add(key)
+
+    def add_cities(self, *cities: str):
+        for city in cities:
+            self.add(city)
+            invalidation_bus.publish(self.namespace, city)
+
+    def add(self, name: str):
+        city = normalize_city(name)
+        with self.lock:
+            self.display.setdefault(city, name)
+            self.routes[city] += 1
+            i = bisect_left(self.names, city)
+            if i < len(self.names) and self.names[i] == city:
+                return
+            self.names.insert(i, city)
+            for word in city.split()[1:]:
+                insort(self.words, (word, city))
+            node = self.trie
+            for ch in city:
+                node = node.setdefault(ch, {})
+            node[WORD] = city
+
+    def load(self, rows):
+        with self.lock:
+            self.names, self.display, self.words, self.trie, self.routes = [], {}, [], {}, Counter()
+        for start_city, end_city in rows:
+            self.add(start_city)
+            self.add(end_city)
+        self.loaded = True
+
+    def warm(self):
+        with Session(database.engine) as session:
+            self.load(session.exec(text(LOAD_CITIES)).all())
+
+    async def ensure_loaded(self, session: AsyncSession):
+        apply_remote_invalidations()
+        if not self.loaded:
+            self.load((await session.exec(text(LOAD_CITIES))).all())
+
+    def stats(self) -> dict:
+        return {'cities': len(self.names), 'loaded': self.loaded}
+
+    def suggest(self, query: str, limit: int = 10, fuzzy: bool = True) -> List[dict]:
+        query = normalize_city(query)
+        if not query:
+            return []
+
+        found = {}
+        with self.lock:
+            i = bisect_left(self.names, query)
+            while i < len(self.names) and self.names[i].startswith(query):
+                found[self.names[i]] = ("prefix", 0)
+                i += 1
+
+            i = bisect_left(self.words, (query,))
+            while i < len(self.words) and self.words[i][0].startswith(query):
+                found.setdefault(self.words[i][1], ("word", 0))
+                i += 1
+
+            if fuzzy and len(found) < limit and max_typos(query):
+                for name, distance in self.fuzzy_prefix(query, max_typos(query)):
+                    found.setdefault(name, ("fuzzy", distance))
+
+            ranked = sorted(found.items(), key=lambda item: (item[1][1], item[1][0] != "prefix", -self.routes[item[0]], item[0]))
+
+        return [{'city': self.display[name], 'match': match, 'distance': distance} for name, (match, distance) in ranked[:limit]]
+
+    def fuzzy_prefix(self, query: str, max_distance: int):
+        # Edit distance between the query and the closest prefix of each name, one DP row per trie level
+        matches = []
+
+        def collect(node, distance):
+            for key, child in node.items():
+                if key == WORD:
+                    matches.append((child, distance))
+                else:
+                    collect(child, distance)
+
+        def walk(node, row, best):
+            # best: closest any prefix on this path has come; names below match at that distance
+            best = min(best, row[-1])
+            # Nothing deeper can come closer than the row minimum
+            if min(row) >= min(best, max_distance + 1):
+                if best <= max_distance:
+                    collect(node, best)
+                return
+            for ch, child in node.items():
+                if ch == WORD:
+                    if best <= max_distance:
+                        matches.append((child, best))
+                    continue
+                walk(child, step(row, ch), best)
+
+        def step(row, ch):
+            nxt = [row[0] + 1]
+            for j in range(1, len(query) + 1):
+                nxt.append(min(nxt[j - 1] + 1, row[j] + 1, row[j - 1] + (query[j - 1] != ch)))
+            return nxt
+
+        # The first letter is taken as typed, like most autocompletes; it keeps the walk to one subtree
+        first = self.trie.get(query[0])
+        if first:
+            walk(first, step(list(range(len(query) + 1)), query[0]), len(query) + 1)
+        return matches
+
+city_index = CityIndex("cities")
@@ -0,0 +1,3 @@
+def normalize_city(name: str) -> str:
+    # Stored in routes.start_key/end_key, so lookups can seek the unique key index directly
+    return " ".join(name.split()).lower()
@@ -0,0 +1,255 @@
+from bisect import bisect_left
+from collections import defaultdict
+from datetime import date, time, timedelta
+from heapq import heappush, heappop
+from itertools import count
+from typing import List, NamedTuple, Optional
+import asyncio
+from sqlmodel import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+from utils.cityUtil import normalize_city
+from utils.refCache import caches, invalidation_bus, apply_remote_invalidations
+
+# Every trip is an edge start_city -> end_city at a fixed time. The graph lives in memory and is
+# searched best-first, so a query never touches the database once the graph is loaded.
+# Writes only mark it stale; the next query pulls in trips above the highest id loaded so far.
+# Ids are handed out before commit (MySQL auto-increment), so a trip can land below that mark
+# after it moved on: the trips counted up to the mark are compared with the last load's, and
+# any difference, including a delete, rebuilds the graph from scratch.
+
+DAY = 24 * 60
+
+LOAD_TRIPS = """
+select t.id, t.route_id, r.start_city, r.end_city, t.departure_time, t.arrival_time, t.price, t.travel_date
+from trips t
+join routes r on r.id = t.route_id
+where t.id > :lastId and t.id <= :topId and (t.travel_date is null or t.travel_date >= :today)
+order by t.id
+"""
+
+# One statement, so the three numbers agree with each other whatever commits meanwhile
+COUNT_TRIPS = """
+select count(*), coalesce(max(id), 0), coalesce(sum(case when id <= :lastId then 1 else 0 end), 0)
+from trips
+"""
+
+class Leg(NamedTuple):
+    # Minutes since midnight for daily (undated) trips, since date.min for dated ones
+    departs: int
+    arrives: int
+    trip_id: int
+    route_id: int
+    start_key: str    # normalized; the graph is keyed on these
+    end_key: str
+    start_city: str
+    end_city: str
+    price: int
+    travel_date: Optional[date]
+
+def to_minutes(value) -> int:
+    # Raw time columns come back as 'HH:MM:SS' on SQLite and as timedelta on MySQL
+    if isinstance(value, timedelta):
+        return int(value.total_seconds()) // 60
+    if isinstance(value, str):
+        value = time.fromisoformat(value)
+    return value.hour * 60 + value.minute
+
+def to_date(value) -> Optional[date]:
+    if value is None or isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+class ConnectionGraph:
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self.daily = defaultdict(list)   # city -> legs sorted by departure
+        self.dated = defaultdict(list)
+        self.feeders = defaultdict(set)  # city -> cities with a direct trip into it
+        self.last_trip_id = 0
+        self.trip_count = 0              # trips in the table, loaded or not, when last_trip_id was set
+        self.rebuilds = 0
+        self.stale = True
+        self.lock = asyncio.Lock()
+        caches[namespace] = self
+
+    def drop(self, key=None):
+        self.stale = True
+
+    def invalidate(self, key=None):
+        self.drop(key)
+        invalidation_bus.publish(self.namespace, key)
+
+    def stats(self) -> dict:
+        return {
+            'cities': len(self.daily.keys() | self.dated.keys()),
+            'legs': sum(map(len, self.daily.values())) + sum(map(len, self.dated.values())),
+            'last_trip_id': self.last_trip_id,
+            'rebuilds': self.rebuilds,
+        }
+
+    def reset(self):
+        self.daily.clear()
+        self.dated.clear()
+        self.feeders.clear()
+        self.last_trip_id = self.trip_count = 0
+        self.rebuilds += 1
+
+    async def refresh(self, session: AsyncSession):
+        apply_remote_invalidations()
+        if not self.stale:
+            return
+        async with self.lock:
+            if not self.stale:
+                return
+            # Cleared before reading, so a trip written during the load marks the graph stale again
+            self.stale = False
+            total, top, below = (await session.exec(text(COUNT_TRIPS), params={'lastId': self.last_trip_id})).one()
+            if below != self.trip_count:
+                self.reset()
+            # Capped at top: anything above it is counted by the next refresh, not this one
+            rows = (await session.exec(
+                text(LOAD_TRIPS),
+                params={'lastId': self.last_trip_id, 'topId': top, 'today': str(date.today())}
+            )).all()
+            self.add_trips(rows)
+            self.last_trip_id, self.trip_count = top, total
+
+    def add_trips(self, rows):
+        touched = set()
+        for row in rows:
+            departs, arrives = to_minutes(row.departure_time), to_minutes(row.arrival_time)
+            if arrives < departs:
+                arrives += DAY   # overnight
+            travel_date = to_date(row.travel_date)
+            if travel_date:
+                base = travel_date.toordinal() * DAY
+                departs, arrives = departs + base, arrives + base
+            leg = Leg(departs, arrives, row.id, row.route_id, normalize_city(row.start_city), normalize_city(row.end_city),
+                      row.start_city, row.end_city, row.price, travel_date)
+            pool = self.dated if travel_date else self.daily
+            pool[leg.start_key].append(leg)
+            self.feeders[leg.end_key].add(leg.start_key)
+            touched.add((travel_date is not None, leg.start_key))
+            self.last_trip_id = max(self.last_trip_id, row.id)
+        for is_dated, city in touched:
+            (self.dated if is_dated else self.daily)[city].sort()
+
+    def hops_to(self, destination: str, max_legs: int) -> dict:
+        # Fewest legs from each city to the destination, ignoring time; a lower bound that prunes
+        # every branch which cannot arrive within the remaining legs
+        hops = {destination: 0}
+        frontier = [destination]
+        for depth in range(1, max_legs + 1):
+            nxt = []
+            for city in frontier:
+                for feeder in self.feeders.get(city, ()):
+                    if feeder not in hops:
+                        hops[feeder] = depth
+                        nxt.append(feeder)
+            frontier = nxt
+        return hops
+
+    def departures(self, city: str, earliest: int, latest: int, dated: bool):
+        # Yields (leg, offset) for legs leaving city in [earliest, latest]; daily legs repeat every DAY
+        legs = (self.dated if dated else self.daily).get(city)
+        if not legs:
+            return
+        days = [0] if dated else range(earliest // DAY, latest // DAY + 1)
+        for day in days:
+            offset = day * DAY
+            i = bisect_left(legs, (earliest - offset,))
+            while i < len(legs) and legs[i].departs + offset <= latest:
+                yield legs[i], offset
+                i += 1
+
+    def search(
+        self,
+        origin: str,
+        destination: str,
+        travel_date: Optional[date] = None,
+        depart_after: int = 0,
+        min_layover: int = 30,
+        max_layover: int = 720,
+        max_legs: int = 3,
+        k: int = 5,
+        sort: str = "duration",
+    ) -> List[dict]:
+        # Best-first over partial itineraries. Duration and price only grow as legs are added,
+        # so itineraries reach the destination in rank order and the first k popped are the k best.
+        # A label is dropped once k labels were popped at the same city and minute (so with the same
+        # layover window) that left no earlier and paid no more: every extension of it is matched by
+        # k at least as good, so none could make the top k. Arriving earlier proves nothing, as the
+        # window may close before the connection it would need.
+        hops = self.hops_to(destination, max_legs)
+        if origin not in hops:
+            return []
+        dated = travel_date is not None
+        start = (travel_date.toordinal() * DAY if dated else 0) + depart_after
+        tie = count()
+        heap = []
+        popped = defaultdict(list)
+        results = []
+
+        def dominated(labels, first, price):
+            return sum(f >= first and p <= price for f, p in labels) >= k
+
+        def push(path, first, arrives, price):
+            cost = (arrives - first, price) if sort == "duration" else (price, arrives - first)
+            heappush(heap, (cost, next(tie), path, first, arrives, price))
+
+        for leg, offset in self.departures(origin, start, start + DAY - 1, dated):
+            if hops.get(leg.end_key, max_legs + 1) > max_legs - 1:
+                continue
+            push(((leg, offset),), leg.departs + offset, leg.arrives + offset, leg.price)
+
+        while heap and len(results) < k:
+            cost, _, path, first, arrives, price = heappop(heap)
+            city = path[-1][0].end_key
+
+            if city == destination:
+                results.append(self.itinerary(path, start - depart_after, arrives - first, price))
+                continue
+
+            if dominated(popped.get((city, arrives), ()), first, price):
+                continue
+            popped[city, arrives].append((first, price))
+
+            if len(path) >= max_legs:
+                continue
+            visited = {origin} | {leg.end_key for leg, _ in path}
+            remaining = max_legs - len(path) - 1
+            for leg, offset in self.departures(city, arrives + min_layover, arrives + max_layover, dated):
+                if leg.end_key in visited or hops.get(leg.end_key, max_legs + 1) > remaining:
+                    continue
+                # Same dominance test as on pop, applied early to keep hopeless labels off the heap
+                if dominated(popped.get((leg.end_key, leg.arrives + offset), ()), first, price + leg.price):
+                    continue
+                push(path + ((leg, offset),), first, leg.arrives + offset, price + leg.price)
+
+        return results
+
+    def itinerary(self, path, day_zero: int, duration: int, price: int) -> dict:
+        def clock(minutes: int) -> time:
+            return time((minutes // 60) % 24, minutes % 60)
+
+        return {
+            'legs': [
+                {
+                    'trip_id': leg.trip_id,
+                    'route_id': leg.route_id,
+                    'start_city': leg.start_city,
+                    'end_city': leg.end_city,
+                    'travel_date': leg.travel_date,
+                    'day_offset': (leg.departs + offset - day_zero) // DAY,
+                    'departure_time': clock(leg.departs),
+                    'arrival_time': clock(leg.arrives),
+                    'price': leg.price,
+                }
+                for leg, offset in path
+            ],
+            'duration_minutes': duration,
+            'price': price,
+            'transfers': len(path) - 1,
+        }
+
+connection_graph = ConnectionGraph("connections")
@@ -0,0 +1,143 @@
+from bisect import bisect_left
+from collections import defaultdict
+from contextvars import ContextVar
+from threading import Lock
+from typing import Optional
+import time
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from database import env_flag
+
+# Per-route request latency, SQL statement count and time spent in the database, exposed in
+# Prometheus text format. Engine hooks add each statement to the request running in the current
+# context; the middleware files the totals under the route template, not the raw path, so
+# /trips/17/seatmap and /trips/18/seatmap land in one series.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SERVER_TIMING = env_flag("SERVER_TIMING", False)
+
+class RequestStats:
+    __slots__ = ("statements", "db_seconds")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_seconds = 0.0
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+class RouteMetrics:
+    __slots__ = ("buckets", "count", "seconds", "statements", "db_seconds", "statuses")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)   # last slot is +Inf
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.statuses = defaultdict(int)
+
+class Metrics:
+    def __init__(self):
+        self.routes = defaultdict(RouteMetrics)   # (method, route template) -> RouteMetrics
+        self.lock = Lock()
+
+    def observe(self, method: str, route: str, status: int, seconds: float, stats: RequestStats):
+        with self.lock:
+            m = self.routes[method, route]
+            m.buckets[bisect_left(LATENCY_BUCKETS, seconds)] += 1
+            m.count += 1
+            m.seconds += seconds
+            m.statements += stats.statements
+            m.db_seconds += stats.db_seconds
+            m.statuses[status] += 1
+
+    def render(self) -> str:
+        with self.lock:
+            routes = sorted(self.routes.items())
+            lines = [
+                "# HELP http_request_duration_seconds Request latency by route template",
+                "# TYPE http_request_duration_seconds histogram",
+            ]
+            for (method, route), m in routes:
+                labels = f'method="{method}",route="{escape(route)}"'
+                cumulative = 0
+                for bound, hits in zip(LATENCY_BUCKETS + ("+Inf",), m.buckets):
+                    cumulative += hits
+                    lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f"http_request_duration_seconds_sum{{{labels}}} {m.seconds:.6f}")
+                lines.append(f"http_request_duration_seconds_count{{{labels}}} {m.count}")
+
+            lines += ["# HELP http_requests_total Requests by route template and status", "# TYPE http_requests_total counter"]
+            for (method, route), m in routes:
+                for status, hits in sorted(m.statuses.items()):
+                    lines.append(f'http_requests_total{{method="{method}",route="{escape(route)}",status="{status}"}} {hits}')
+
+            lines += ["# HELP db_statements_total SQL statements issued while serving a route", "# TYPE db_statements_total counter"]
+            for (method, route), m in routes:
+                lines.append(f'db_statements_total{{method="{method}",route="{escape(route)}"}} {m.statements}')
+
+            lines += ["# HELP db_time_seconds_total Time spent executing SQL while serving a route", "# TYPE db_time_seconds_total counter"]
+            for (method, route), m in routes:
+                lines.append(f'db_time_seconds_total{{method="{method}",route="{escape(route)}"}} {m.db_seconds:.6f}')
+        return "\n".join(lines) + "\n"
+
+COUNTER_STATS = {'hits', 'misses', 'evictions'}
+
+def render_cache_stats(stats: dict) -> str:
+    # {cache name: {stat: number}} as cache_<stat>{cache="..."}; hit/miss/eviction totals are counters
+    series = defaultdict(list)
+    for cache, values in sorted(stats.items()):
+        for stat, value in values.items():
+            if isinstance(value, (int, float)):
+                series[stat].append(f'cache_{stat}{{cache="{escape(cache)}"}} {float(value):g}')
+    lines = []
+    for stat, samples in sorted(series.items()):
+        lines.append(f"# TYPE cache_{stat} {'counter' if stat in COUNTER_STATS else 'gauge'}")
+        lines += samples
+    return "\n".join(lines) + "\n" if lines else ""
+
+def escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+metrics = Metrics()
+
+# Listening on the Engine class covers every engine, including ones created after import
+# (the benchmarks swap in their own) and the sync engine behind the async one
+@event.listens_for(Engine, "before_cursor_execute")
+def statement_started(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and current_request.get() is not None:
+        context._metrics_started = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def statement_finished(conn, cursor, statement, parameters, context, executemany):
+    stats = current_request.get()
+    started = getattr(context, "_metrics_started", None)
+    if stats is not None and started is not None:
+        stats.statements += 1
+        stats.db_seconds += time.perf_counter() - started
+
+def route_template(request: Request) -> str:
+    # The router leaves the matched route in the scope; anything unmatched shares one series
+    route = request.scope.get("route")
+    return getattr(route, "path", "unmatched")
+
+async def metrics_middleware(request: Request, call_next):
+    stats = RequestStats()
+    token = current_request.set(stats)
+    started = time.perf_counter()
+    try:
+        response = await call_next(request)
+    except Exception:
+        metrics.observe(request.method, route_template(request), 500, time.perf_counter() - started, stats)
+        raise
+    finally:
+        current_request.reset(token)
+    elapsed = time.perf_counter() - started
+    metrics.observe(request.method, route_template(request), response.status_code, elapsed, stats)
+
+    if SERVER_TIMING:
+        response.headers["Server-Timing"] = (
+            f'db;dur={stats.db_seconds * 1000:.2f};desc="{stats.statements} statements", app;dur={elapsed * 1000:.2f}'
+        )
+    return response
@@ -0,0 +1,25 @@
+from typing import List
+import base64
+
+# Compact seat occupancy: position i refers to the i-th seat of the layout, in seat id order
+
+def encode_bitmap(booked: List[bool]) -> str:
+    # Bit i (least significant bit first within each byte) is set when seat i is booked
+    bits = bytearray((len(booked) + 7) // 8)
+    for i, taken in enumerate(booked):
+        if taken:
+            bits[i >> 3] |= 1 << (i & 7)
+    return base64.b64encode(bytes(bits)).decode()
+
+def encode_rle(booked: List[bool]) -> List[int]:
+    # Alternating run lengths, always starting with a (possibly empty) run of free seats
+    runs: List[int] = []
+    current = False
+    count = 0
+    for taken in booked:
+        if taken != current:
+            runs.append(count)
+            current, count = taken, 0
+        count += 1
+    runs.append(count)
+    return runs
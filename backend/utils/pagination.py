@@ -0,0 +1,15 @@
+from fastapi import HTTPException, status
+import base64
+import json
+
+# Keyset cursors are the sort key of the last row on a page, packed into an opaque url-safe string
+
+def encode_cursor(*values) -> str:
+    raw = json.dumps([v.isoformat() if hasattr(v, "isoformat") else v for v in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str) -> list:
+    try:
+        return json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
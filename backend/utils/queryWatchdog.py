@@ -0,0 +1,116 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, List, Optional
+import logging
+import os
+import re
+import time
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from database import env_flag
+
+# Development aid: groups the statements of each request by normalized SQL and flags one that
+# repeats more than REPEAT_LIMIT times (the shape of a lookup inside a loop), and logs every
+# statement slower than SLOW_QUERY_MS with its parameters and the endpoint that issued it.
+# Off unless QUERY_WATCHDOG is set; the query_watchdog fixture in tests/conftest.py turns it on per test.
+
+logger = logging.getLogger(__name__)
+
+class RepeatedQueryError(RuntimeError):
+    pass
+
+class WatchdogSettings:
+    def __init__(self):
+        self.enabled = env_flag("QUERY_WATCHDOG", False)
+        self.repeat_limit = int(os.getenv("QUERY_REPEAT_LIMIT", 5))
+        self.action = os.getenv("QUERY_REPEAT_ACTION", "warn")   # warn | raise
+        self.slow_ms = float(os.getenv("SLOW_QUERY_MS", 100))
+
+settings = WatchdogSettings()
+
+LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+NUMBERED_BINDS = re.compile(r"([:@$])([A-Za-z_]+?)\d+\b")
+LISTS = re.compile(r"\(\s*(\?|%s|:[A-Za-z_]+)(\s*,\s*\1)+\s*\)")
+
+def normalize_sql(statement: str) -> str:
+    # Literals and expanded IN lists vary between iterations of the same loop; the shape does not
+    sql = " ".join(statement.split())
+    sql = LITERALS.sub("?", sql)
+    sql = NUMBERED_BINDS.sub(r"\1\2", sql)
+    return LISTS.sub(r"(\1, ...)", sql)
+
+class QueryWatch:
+    def __init__(self, endpoint: Callable[[], str], repeat_limit: int, action: str, slow_ms: float):
+        self.endpoint = endpoint
+        self.repeat_limit = repeat_limit
+        self.action = action
+        self.slow_ms = slow_ms
+        self.counts = Counter()
+        self.violations: List[str] = []
+
+    def seen(self, statement: str, parameters, elapsed_ms: float):
+        if elapsed_ms >= self.slow_ms:
+            logger.warning("slow query %.1f ms in %s: %s params=%s",
+                           elapsed_ms, self.endpoint(), " ".join(statement.split()), short(parameters))
+
+        sql = normalize_sql(statement)
+        self.counts[sql] += 1
+        if self.counts[sql] == self.repeat_limit + 1:
+            message = f"statement repeated more than {self.repeat_limit} times in {self.endpoint()}: {sql}"
+            self.violations.append(message)
+            if self.action == "raise":
+                raise RepeatedQueryError(message)
+            logger.warning(message)
+
+def short(parameters, limit: int = 500) -> str:
+    text = repr(parameters)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+current_watch: ContextVar[Optional[QueryWatch]] = ContextVar("current_watch", default=None)
+# Repeats seen while serving requests are copied here for the fixture, as TestClient runs the app
+# on another thread where the test's own watch is not visible
+reported_repeats: List[List[str]] = []
+
+@contextmanager
+def watch_queries(endpoint: Callable[[], str], repeat_limit: Optional[int] = None,
+                  action: Optional[str] = None, slow_ms: Optional[float] = None):
+    watch = QueryWatch(
+        endpoint,
+        settings.repeat_limit if repeat_limit is None else repeat_limit,
+        action or settings.action,
+        settings.slow_ms if slow_ms is None else slow_ms,
+    )
+    token = current_watch.set(watch)
+    try:
+        yield watch
+    finally:
+        current_watch.reset(token)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def statement_started(conn, cursor, statement, parameters, context, executemany):
+    if context is not None and current_watch.get() is not None:
+        context._watchdog_started = time.perf_counter()
+
+@event.listens_for(Engine, "after_cursor_execute")
+def statement_finished(conn, cursor, statement, parameters, context, executemany):
+    watch = current_watch.get()
+    started = getattr(context, "_watchdog_started", None)
+    if watch is not None and started is not None:
+        watch.seen(statement, parameters, (time.perf_counter() - started) * 1000)
+
+async def watchdog_middleware(request: Request, call_next):
+    if not settings.enabled:
+        return await call_next(request)
+
+    def endpoint() -> str:
+        route = request.scope.get("route")
+        return f"{request.method} {getattr(route, 'path', request.url.path)}"
+
+    with watch_queries(endpoint) as watch:
+        try:
+            return await call_next(request)
+        finally:
+            for sink in reported_repeats:
+                sink.extend(watch.violations)
@@ -0,0 +1,101 @@
+from threading import Lock
+from typing import Any, Hashable, Optional
+import json
+import os
+from utils.cache import LRUCache
+
+# Bus and route rows almost never change, so lookups are served from memory.
+# Writes invalidate explicitly; the TTL only bounds how long a missed invalidation can live.
+
+class NullInvalidationBus:
+    # Single process: local invalidation is all there is
+    def publish(self, namespace: str, key: Optional[Hashable]):
+        pass
+
+    def poll(self):
+        return []
+
+class FileInvalidationBus:
+    # Local stand-in for a pub/sub channel: every worker appends invalidations to one shared file
+    # and replays what the others wrote since its last read. A stat() per lookup is the only cost.
+
+    def __init__(self, path: str):
+        self.path = path
+        self.lock = Lock()
+        open(path, "a").close()
+        self.offset = os.path.getsize(path)
+
+    def publish(self, namespace: str, key: Optional[Hashable]):
+        line = json.dumps([os.getpid(), namespace, key]) + "\n"
+        with open(self.path, "a") as f:
+            f.write(line)
+
+    def poll(self):
+        if os.path.getsize(self.path) <= self.offset:
+            return []
+        with self.lock:
+            with open(self.path) as f:
+                f.seek(self.offset)
+                lines = f.readlines()
+                # Keep a torn last line for the next poll
+                if lines and not lines[-1].endswith("\n"):
+                    lines.pop()
+                self.offset += sum(len(line) for line in lines)
+        events = []
+        for line in lines:
+            pid, namespace, key = json.loads(line)
+            if pid != os.getpid():
+                events.append((namespace, tuple(key) if isinstance(key, list) else key))
+        return events
+
+def make_invalidation_bus():
+    path = os.getenv("REF_CACHE_INVALIDATION_FILE")
+    return FileInvalidationBus(path) if path else NullInvalidationBus()
+
+invalidation_bus = make_invalidation_bus()
+caches = {}
+
+def shares_invalidations() -> bool:
+    # False when what this process publishes reaches nobody else, e.g. a CLI run beside a server
+    return not isinstance(invalidation_bus, NullInvalidationBus)
+
+class ReferenceCache:
+    def __init__(self, namespace: str, maxsize: int, ttl: float, backend=None):
+        self.namespace = namespace
+        self.backend = backend or LRUCache(maxsize=maxsize, ttl=ttl)
+        caches[namespace] = self
+
+    def get(self, key: Hashable) -> Any:
+        apply_remote_invalidations()
+        return self.backend.get(key)
+
+    def set(self, key: Hashable, value: Any):
+        self.backend.set(key, value)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        # key=None drops the whole namespace
+        self.drop(key)
+        invalidation_bus.publish(self.namespace, key)
+
+    def drop(self, key: Optional[Hashable]):
+        if key is None:
+            self.backend.clear()
+        else:
+            self.backend.delete(key)
+
+    def stats(self) -> dict:
+        return self.backend.stats()
+
+def apply_remote_invalidations():
+    for namespace, key in invalidation_bus.poll():
+        if namespace in caches:
+            caches[namespace].drop(key)
+
+REF_CACHE_SIZE = int(os.getenv("REF_CACHE_SIZE", 5000))
+REF_CACHE_TTL_SECONDS = int(os.getenv("REF_CACHE_TTL_SECONDS", 300))
+
+bus_cache = ReferenceCache("buses", REF_CACHE_SIZE, REF_CACHE_TTL_SECONDS)
+route_cache = ReferenceCache("routes", REF_CACHE_SIZE, REF_CACHE_TTL_SECONDS)
+
+def cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in caches.items()}
@@ -0,0 +1,38 @@
+from sqlmodel import Session, text
+from database import engine
+import argparse
+
+# Expected availability for a trip: bus capacity minus the tripseats currently held
+EXPECTED_SEATS = """
+(select b.total_seat from buses b where b.id = trips.bus_id)
+- (select count(*) from tripseats ts where ts.trip_id = trips.id)
+"""
+
+def find_drift(session: Session):
+    return session.exec(
+        text(f"select id, seatsAvailable, {EXPECTED_SEATS} as expected from trips where seatsAvailable <> {EXPECTED_SEATS}")
+    ).all()
+
+def repair_drift(session: Session) -> int:
+    result = session.exec(
+        text(f"update trips set seatsAvailable = {EXPECTED_SEATS}, version = version + 1 where seatsAvailable <> {EXPECTED_SEATS}")
+    )
+    session.commit()
+    return result.rowcount
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and repair drift in trips.seatsAvailable")
+    parser.add_argument("--repair", action="store_true", help="rewrite drifted counters in one bulk update")
+    args = parser.parse_args()
+
+    with Session(engine) as session:
+        drift = find_drift(session)
+        for row in drift:
+            print(f"trip {row.id}: seatsAvailable={row.seatsAvailable} expected={row.expected}")
+        print(f"{len(drift)} trip(s) drifted")
+
+        if args.repair and drift:
+            print(f"{repair_drift(session)} trip(s) repaired")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+from typing import List, Optional
+from string import ascii_uppercase
+from models.busType import BusSeatType
+
+# Seats per row when the caller does not say: sleepers are 2 berths across, seaters 2+2
+DEFAULT_COLUMNS = {
+    BusSeatType.SLEEPER: 2,
+    BusSeatType.SEATER: 4,
+}
+
+def generate_seat_labels(total_seat: int, seat_type: BusSeatType, columns: Optional[int] = None) -> List[str]:
+    # Row-major labels "1A", "1B", ... so the same bus always gets the same layout
+    # An empty layout would reach the seat insert as an executemany with no rows
+    if total_seat <= 0:
+        raise ValueError("total_seat must be positive")
+    columns = columns or DEFAULT_COLUMNS[seat_type]
+    if not 1 <= columns <= len(ascii_uppercase):
+        raise ValueError(f"columns must be between 1 and {len(ascii_uppercase)}")
+    return [f"{i // columns + 1}{ascii_uppercase[i % columns]}" for i in range(total_seat)]
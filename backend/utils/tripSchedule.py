@@ -0,0 +1,57 @@
+from sqlmodel import Session, text
+from datetime import date, timedelta
+from typing import List, Optional
+import database
+from utils.connectionGraph import connection_graph
+import argparse
+import os
+
+# Dated trips are materialized from schedules ahead of time so search and booking only
+# ever touch concrete (route, day) rows. One INSERT ... SELECT per day covers every schedule,
+# and re-running over the same window only fills in what is missing.
+
+TRIP_WINDOW_DAYS = int(os.getenv("TRIP_WINDOW_DAYS", 30))
+
+MATERIALIZE_DAY = """
+INSERT INTO trips(bus_id, route_id, schedule_id, travel_date, departure_time, arrival_time, price, seatsAvailable)
+SELECT s.bus_id, s.route_id, s.id, :day, s.departure_time, s.arrival_time, s.price, b.total_seat
+FROM schedules s
+JOIN buses b ON b.id = s.bus_id
+WHERE s.valid_from <= :day AND s.valid_to >= :day
+  AND (s.days_of_week & :dow) <> 0
+  AND (:sId IS NULL OR s.id = :sId)
+  AND NOT EXISTS (SELECT 1 FROM trips t WHERE t.schedule_id = s.id AND t.travel_date = :day)
+"""
+
+def days_mask(days: List[int]) -> int:
+    # 0 = Monday ... 6 = Sunday, as date.weekday()
+    return sum(1 << d for d in set(days))
+
+def materialize_trips(session: Session, start: date, days: int = TRIP_WINDOW_DAYS, scheduleId: Optional[int] = None) -> int:
+    window = [start + timedelta(days=i) for i in range(days)]
+    result = session.execute(
+        text(MATERIALIZE_DAY),
+        [{'day': str(d), 'dow': 1 << d.weekday(), 'sId': scheduleId} for d in window]
+    )
+    session.commit()
+    return result.rowcount
+
+def materialize_window(start: Optional[date] = None, days: int = TRIP_WINDOW_DAYS) -> int:
+    # Rolling window from today by default; run at startup and from cron via the CLI below
+    with Session(database.engine) as session:
+        created = materialize_trips(session, start or date.today(), days)
+    if created:
+        # Reaches other running workers only when they share REF_CACHE_INVALIDATION_FILE
+        connection_graph.invalidate()
+    return created
+
+def main():
+    parser = argparse.ArgumentParser(description="Materialize dated trips from schedules for a rolling window")
+    parser.add_argument("--days", type=int, default=TRIP_WINDOW_DAYS, help="days ahead to cover")
+    parser.add_argument("--start", type=date.fromisoformat, default=None, help="first day (YYYY-MM-DD), default today")
+    args = parser.parse_args()
+
+    print(f"{materialize_window(args.start, args.days)} trip(s) created")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+from fastapi import Request, Response
+from threading import Lock
+from typing import Hashable, Optional
+import hashlib
+import uuid
+from utils.refCache import caches, invalidation_bus, apply_remote_invalidations
+
+# ETags on polled GETs. Anything another process can change (seat counts, a route's trips) is
+# tagged from the database: trips.version moves with every booking and cancel in the same
+# transaction, so a cheap probe on it is enough to answer 304. In-memory stamps are left for data
+# only this process writes and never rewrites in place, such as a bus's seat layout.
+
+# In-memory counters start from zero with the process, so tags from an earlier run must never match
+EPOCH = uuid.uuid4().hex
+
+class VersionStamps:
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+        self.versions = {}
+        self.generation = 0
+        self.lock = Lock()
+        # Registered beside the reference caches so bumps from other workers arrive on the same bus
+        caches[namespace] = self
+
+    def current(self, key: Hashable) -> str:
+        apply_remote_invalidations()
+        with self.lock:
+            return f"{EPOCH}.{self.generation}.{self.versions.get(key, 0)}"
+
+    def bump(self, *keys: Optional[Hashable]):
+        # key None bumps every entry in the namespace
+        for key in keys:
+            self.drop(key)
+            invalidation_bus.publish(self.namespace, key)
+
+    def drop(self, key: Optional[Hashable]):
+        with self.lock:
+            if key is None:
+                self.generation += 1
+                self.versions.clear()
+            else:
+                self.versions[key] = self.versions.get(key, 0) + 1
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {'size': len(self.versions), 'generation': self.generation}
+
+bus_versions = VersionStamps("bus_versions")
+
+def make_etag(*parts) -> str:
+    digest = hashlib.sha1(":".join(str(p) for p in parts).encode()).hexdigest()
+    return f'"{digest[:24]}"'
+
+def etag_headers(etag: str) -> dict:
+    # no-cache: clients may keep the body but must revalidate on every poll
+    return {'ETag': etag, 'Cache-Control': "no-cache"}
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    tags = [t.strip().removeprefix("W/") for t in header.split(",")]
+    if "*" in tags or etag in tags:
+        return Response(status_code=304, headers=etag_headers(etag))
+    return None
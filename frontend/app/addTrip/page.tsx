@@ -26,6 +26,7 @@ export default function AddTripPage() {
     end_city: "",
     departure_time: "",
     arrival_time: "",
+    travel_date: "",
     price: ""
   });
 
@@ -103,6 +104,8 @@ export default function AddTripPage() {
         end_city: formData.end_city,
         departure_time: formatTimeForBackend(formData.departure_time),
         arrival_time: formatTimeForBackend(formData.arrival_time),
+        // Blank leaves the trip undated; undated trips run daily and show up in every search
+        travel_date: formData.travel_date || null,
         price: Number(formData.price)
       };
 
@@ -151,6 +154,7 @@ export default function AddTripPage() {
         end_city: "",
         departure_time: "",
         arrival_time: "",
+        travel_date: "",
         price: ""
       });
 
@@ -299,6 +303,20 @@ export default function AddTripPage() {
                   />
                 </div>
 
+                {/* Travel Date */}
+                <div className="space-y-1">
+                  <label className="text-sm font-semibold text-gray-700 flex items-center">
+                    <Clock size={16} className="mr-2 text-blue-600"/> Travel Date (optional)
+                  </label>
+                  <input 
+                    type="date" 
+                    name="travel_date" 
+                    value={formData.travel_date} 
+                    onChange={handleChange} 
+                    className="w-full px-4 py-2 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 outline-none"
+                  />
+                </div>
+
               </div>
             </div>
 
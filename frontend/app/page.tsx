@@ -9,12 +9,40 @@ import {
 import Link from 'next/link';
 import { useRouter } from 'next/navigation';
 
+interface CitySuggestion {
+  city: string;
+  match: 'prefix' | 'word' | 'fuzzy';
+  distance: number;
+}
+
+// Suggestions for a city field, refreshed on every keystroke; stale requests are aborted
+const useCitySuggestions = (value: string) => {
+  const [suggestions, setSuggestions] = useState<string[]>([]);
+
+  useEffect(() => {
+    if (!value.trim()) {
+      setSuggestions([]);
+      return;
+    }
+    const controller = new AbortController();
+    fetch(`http://localhost:8000/routes/cities/suggest?q=${encodeURIComponent(value)}`, { signal: controller.signal })
+      .then(res => res.ok ? res.json() : { data: [] })
+      .then(json => setSuggestions((json.data as CitySuggestion[]).map(s => s.city)))
+      .catch(() => {});
+    return () => controller.abort();
+  }, [value]);
+
+  return suggestions;
+};
+
 // Main App component representing the entire homepage
 const App = () => {
   // State to manage search form inputs
   const [from, setFrom] = useState('');
   const [to, setTo] = useState('');
   const [date, setDate] = useState('');
+  const fromSuggestions = useCitySuggestions(from);
+  const toSuggestions = useCitySuggestions(to);
   const [profile, setProfile] = useState({name: "",email: "",role: ""});
   const router = useRouter();
 
@@ -187,10 +215,15 @@ const App = () => {
                     id="from"
                     type="text"
                     value={from}
+                    list="from-cities"
+                    autoComplete="off"
                     onChange={(e) => setFrom(e.target.value)}
                     className="w-full pl-10 pr-4 py-3 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500 transition-shadow duration-200"
                     placeholder="Source City"
                   />
+                  <datalist id="from-cities">
+                    {fromSuggestions.map(city => <option key={city} value={city} />)}
+                  </datalist>
                 </div>
               </div>
 
@@ -203,10 +236,15 @@ const App = () => {
                     id="to"
                     type="text"
                     value={to}
+                    list="to-cities"
+                    autoComplete="off"
                     onChange={(e) => setTo(e.target.value)}
                     className="w-full pl-10 pr-4 py-3 border border-gray-300 rounded-lg focus:ring-2 focus:ring-blue-500 focus:border-blue-500 transition-shadow duration-200"
                     placeholder="Destination City"
                   />
+                  <datalist id="to-cities">
+                    {toSuggestions.map(city => <option key={city} value={city} />)}
+                  </datalist>
                 </div>
               </div>
 
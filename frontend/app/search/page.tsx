@@ -1,6 +1,6 @@
 "use client"
 
-import React, { useState, useEffect, useMemo } from 'react';
+import React, { useState, useEffect, useCallback } from 'react';
 import { useSearchParams, useRouter } from 'next/navigation';
 import { 
   ArrowLeft, BusFront, Star, Wifi, Coffee, BatteryCharging, 
@@ -29,17 +29,33 @@ interface Seat {
   seat_label: string;
 }
 
-interface BookedSeat {
-  id: number;
-  trip_id: number;
-  seat_id: number;
+interface SeatMapResponse {
+  message: string;
+  data: {
+    trip_id: number;
+    bus_id: number;
+    seat_ids: number[];
+    seat_labels: string[];
+    encoding: 'bitmap';
+    occupancy: string;
+    booked: number;
+  };
 }
 
 interface ApiResponse {
   message: string;
   data: Bus[];
+  next_cursor: string | null;
 }
 
+// Filter checkboxes map onto the trip search query parameters
+const FILTER_PARAMS: Record<string, [string, string]> = {
+  'AC': ['air_type', 'AC'],
+  'Non-AC': ['air_type', 'NON_AC'],
+  'Sleeper': ['seat_type', 'Sleeper'],
+  'Seater': ['seat_type', 'Seater'],
+};
+
 const API_BASE_URL = "http://localhost:8000";
 
 const SearchPage = () => {
@@ -55,6 +71,8 @@ const SearchPage = () => {
   const [error, setError] = useState<string | null>(null);
   const [sortBy, setSortBy] = useState('recommended');
   const [selectedFilters, setSelectedFilters] = useState<string[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   // --- Booking Modal State ---
   const [selectedBus, setSelectedBus] = useState<Bus | null>(null);
@@ -69,28 +87,43 @@ const SearchPage = () => {
   const [bookingError, setBookingError] = useState<string>("");
 
   // --- 1. Fetch Buses ---
+  // Filtering, sorting and paging all happen in the trip search query
+  const fetchTrips = useCallback(async (cursor: string | null) => {
+    const params = new URLSearchParams({ start_city: fromCity, end_city: toCity, sort: sortBy });
+    selectedFilters.forEach(f => params.append(...FILTER_PARAMS[f]));
+    // Dated searches see that day's trips plus the undated ones, which run daily
+    if (/^\d{4}-\d{2}-\d{2}$/.test(date)) params.set('travel_date', date);
+    if (cursor) params.set('cursor', cursor);
+    const url = `${API_BASE_URL}/trips/get?${params}`;
+
+    let response = await fetch(url, {
+        method: 'GET',
+        headers: { 'Content-Type': 'application/json' },
+        credentials: "include",
+    });
+
+    if (response.status === 403 || response.status === 401) {
+       const refreshRes = await fetch(`${API_BASE_URL}/refresh`, { method: "POST", credentials: "include" });
+       if (!refreshRes.ok) { router.push("/login"); return null; }
+       response = await fetch(url, {
+           method: 'GET', headers: { 'Content-Type': 'application/json' }, credentials: "include",
+       });
+    }
+    
+    if (!response.ok) throw new Error('Failed to fetch buses');
+    const jsonData: ApiResponse = await response.json();
+    return jsonData;
+  }, [fromCity, toCity, date, sortBy, selectedFilters, router]);
+
   useEffect(() => {
     const fetchBuses = async () => {
       setLoading(true);
       setError(null);
       try {
-        let response = await fetch(`${API_BASE_URL}/trips/get?start_city=${fromCity}&end_city=${toCity}`, {
-            method: 'GET',
-            headers: { 'Content-Type': 'application/json' },
-            credentials: "include",
-        });
-
-        if (response.status === 403 || response.status === 401) {
-           const refreshRes = await fetch(`${API_BASE_URL}/refresh`, { method: "POST", credentials: "include" });
-           if (!refreshRes.ok) { router.push("/login"); return; }
-           response = await fetch(`${API_BASE_URL}/trips/get?start_city=${fromCity}&end_city=${toCity}`, {
-               method: 'GET', headers: { 'Content-Type': 'application/json' }, credentials: "include",
-           });
-        }
-        
-        if (!response.ok) throw new Error('Failed to fetch buses');
-        const jsonData: ApiResponse = await response.json();
+        const jsonData = await fetchTrips(null);
+        if (!jsonData) return;
         setBuses(jsonData.data); 
+        setNextCursor(jsonData.next_cursor);
       } catch (err) {
         console.error(err);
         setError("Unable to load buses. Please try again.");
@@ -99,9 +132,25 @@ const SearchPage = () => {
       }
     };
     fetchBuses();
-  }, [fromCity, toCity, date, router]);
+  }, [fetchTrips]);
 
-  // --- 2. Filter & Sort Logic ---
+  const loadMore = async () => {
+    if (!nextCursor) return;
+    setLoadingMore(true);
+    try {
+      const jsonData = await fetchTrips(nextCursor);
+      if (!jsonData) return;
+      setBuses(prev => [...prev, ...jsonData.data]);
+      setNextCursor(jsonData.next_cursor);
+    } catch (err) {
+      console.error(err);
+      setError("Unable to load buses. Please try again.");
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
+  // --- 2. Filter & Sort ---
   const handleFilterChange = (filterType: string) => {
     setSelectedFilters(prev => {
       if (prev.includes(filterType)) return prev.filter(f => f !== filterType);
@@ -109,25 +158,7 @@ const SearchPage = () => {
     });
   };
 
-  const displayBuses = useMemo(() => {
-    let result = [...buses];
-
-    if (selectedFilters.length > 0) {
-      result = result.filter(bus => {
-        const airFilters = selectedFilters.filter(f => ['AC', 'Non-AC'].includes(f));
-        const seatFilters = selectedFilters.filter(f => ['Sleeper', 'Seater'].includes(f));
-        const matchesAir = airFilters.length === 0 || airFilters.includes(bus.air_type);
-        const matchesSeat = seatFilters.length === 0 || seatFilters.includes(bus.seat_type);
-        return matchesAir && matchesSeat;
-      });
-    }
-
-    if (sortBy === 'price_low') result.sort((a, b) => a.price - b.price);
-    else if (sortBy === 'price_high') result.sort((a, b) => b.price - a.price);
-    else if (sortBy === 'rating') result.sort((a, b) => b.rating - a.rating);
-
-    return result;
-  }, [buses, selectedFilters, sortBy]);
+  const displayBuses = buses;
 
   // --- 3. Booking Logic ---
 
@@ -141,29 +172,15 @@ const SearchPage = () => {
     setSeatsLoading(true);
 
     try {
-        // A. Fetch All Seats for this Bus
-        // Note: Assuming `bus.bus_id` exists. If the previous API only returns `id` (trip_id), 
-        // ensure the backend also sends `bus_id` in the trip details.
-        const seatRes = await fetch(`${API_BASE_URL}/seat/${bus.bus_id}`, { credentials: "include" });
-        if(!seatRes.ok) throw new Error("Failed to load seat map");
-        const seatData = await seatRes.json();
-        setAllSeats(seatData.data || []);
-
-        // B. Fetch Booked Seats for this Trip
-        const bookedRes = await fetch(`${API_BASE_URL}/tripSeat/${bus.id}`, { credentials: "include" });
-        
-        if (bookedRes.status === 404) {
-            // No seats booked yet
-            setBookedSeatIds([]);
-        } else if (bookedRes.ok) {
-            const bookedData = await bookedRes.json();
-            // Extract just the seat_ids from the response
-            const bookedIds = (bookedData.data || []).map((item: BookedSeat) => item.seat_id);
-            setBookedSeatIds(bookedIds);
-        } else {
-            // Handle other errors gracefully
-            console.error("Error fetching booked seats");
-        }
+        // Layout and occupancy for this trip in one call; occupancy is a base64 bitmap in seat order
+        const mapRes = await fetch(`${API_BASE_URL}/trips/${bus.id}/seatmap`, { credentials: "include" });
+        if(!mapRes.ok) throw new Error("Failed to load seat map");
+        const mapData: SeatMapResponse = await mapRes.json();
+        const { seat_ids, seat_labels, occupancy } = mapData.data;
+
+        const bits = Uint8Array.from(atob(occupancy), c => c.charCodeAt(0));
+        setAllSeats(seat_ids.map((id, i) => ({ id, bus_id: mapData.data.bus_id, seat_label: seat_labels[i] })));
+        setBookedSeatIds(seat_ids.filter((_, i) => (bits[i >> 3] >> (i & 7)) & 1));
 
     } catch (err) {
         setBookingError("Could not load seat map. Please try again.");
@@ -331,7 +348,7 @@ const SearchPage = () => {
           <main className="w-full lg:w-3/4">
             <div className="bg-white p-4 rounded-xl shadow-sm mb-4 flex justify-between items-center">
               <span className="font-bold text-gray-700">
-                {loading ? 'Searching...' : `${displayBuses.length} Buses found`}
+                {loading ? 'Searching...' : `${displayBuses.length}${nextCursor ? '+' : ''} Buses found`}
               </span>
               <div className="flex items-center space-x-2 text-sm">
                 <span className="text-gray-500">Sort by:</span>
@@ -343,6 +360,7 @@ const SearchPage = () => {
                   <option value="recommended">Recommended</option>
                   <option value="price_low">Cheapest First</option>
                   <option value="price_high">Price High to Low</option>
+                  <option value="departure">Earliest Departure</option>
                   <option value="rating">Top Rated</option>
                 </select>
               </div>
@@ -443,6 +461,18 @@ const SearchPage = () => {
                 </div>
               ))}
             </div>
+
+            {!loading && nextCursor && (
+              <div className="flex justify-center mt-6">
+                <button
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                  className="bg-white border border-blue-600 text-blue-600 font-bold py-2 px-6 rounded-lg hover:bg-blue-50 disabled:opacity-50"
+                >
+                  {loadingMore ? 'Loading...' : 'Show more buses'}
+                </button>
+              </div>
+            )}
           </main>
         </div>
       </div>